@@ -0,0 +1,220 @@
+"""
+Cache the energy distributions of the Lissajous laser scanner.
+
+Energy maps are stored under a hash of all the settings used to compute
+them, so the same map is never computed twice. Recently used maps are
+kept in memory, and every map is also saved as a .npy file so that it can
+be reused by later sessions and other tools.
+
+Classes
+-------
+EnergyMapCache: Holds the energy maps in memory and on disk
+
+Functions
+---------
+cacheKey(settings): The canonical hash of a dict of settings
+"""
+
+import collections
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import gaussPow
+
+
+def cacheKey(settings):
+    """
+    Return the canonical hash of a dict of settings.
+
+    Numbers are converted to floats so that, for example, 1 and 1.0 give
+    the same key, and lists and tuples are treated the same way.
+    """
+    def canonical(value):
+        if isinstance(value, (list, tuple, np.ndarray)):
+            return [canonical(v) for v in value]
+        elif isinstance(value, (bool, str)) or value is None:
+            return value
+        return float(value)
+
+    text = json.dumps({k: canonical(v) for k, v in settings.items()},
+                      sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+class EnergyMapCache():
+    """
+    Hold energy maps in memory and on disk.
+
+    Parameters
+    ----------
+    directory: Where to save the maps; if None, maps are only held in memory
+    maxMemoryBytes: The most bytes of maps to hold in memory
+    maxDiskBytes: The most bytes of maps to keep on disk
+    maxAge: The most seconds a map is kept on disk after it was last used
+
+    Variables
+    ---------
+    directory: Where the maps are saved
+    maxMemoryBytes: The most bytes of maps to hold in memory
+    maxDiskBytes: The most bytes of maps to keep on disk
+    maxAge: The most seconds a map is kept on disk after it was last used
+    memory: OrderedDict of the maps held in memory, least recently used
+            first
+    memoryBytes: The number of bytes of maps held in memory
+    stats: Counts of memoryHits, diskHits, misses, memoryEvictions and
+           diskEvictions
+
+    Methods
+    -------
+    energyMap(self, xFreq, yFreq, delta, sigma2X, sigma2Y, ...): Return the
+        energy map for the given settings, computing it if needed
+    get(self, key): Return the map stored under key, or None
+    put(self, key, points): Store a map under key, in memory and on disk
+    evictDisk(self): Remove maps from disk which are too old or too many
+    """
+
+    def __init__(self, directory=None, maxMemoryBytes=2**28,
+                 maxDiskBytes=2**32, maxAge=30 * 24 * 3600):
+        """Initialise the class."""
+        self.directory = directory
+        self.maxMemoryBytes = maxMemoryBytes
+        self.maxDiskBytes = maxDiskBytes
+        self.maxAge = maxAge
+
+        self.memory = collections.OrderedDict()
+        self.memoryBytes = 0
+        self.stats = dict.fromkeys(("memoryHits", "diskHits", "misses",
+                                    "memoryEvictions", "diskEvictions"), 0)
+
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def energyMap(self, xFreq, yFreq, delta, sigma2X, sigma2Y, numPoints=201,
+                  extent=(-1, 1), tolerance=1e-6, engine="auto"):
+        """
+        Return the energy map for the given settings.
+
+        The map is found with gaussPow.adaptiveEnergyMap() over a
+        numPoints x numPoints grid covering extent in x and y, unless it is
+        already in the cache. The returned array must not be modified.
+        """
+        key = cacheKey({"xFreq": xFreq, "yFreq": yFreq, "delta": delta,
+                        "sigma2X": sigma2X, "sigma2Y": sigma2Y,
+                        "numPoints": numPoints, "extent": extent,
+                        "tolerance": tolerance, "engine": engine})
+        points = self.get(key)
+        if points is None:
+            x = np.linspace(extent[0], extent[1], numPoints)
+            points = gaussPow.adaptiveEnergyMap(
+                x, x, sigma2X, sigma2Y, xFreq, yFreq, delta,
+                tolerance=tolerance, engine=engine)[0]
+            points = self.put(key, points)
+        return points
+
+    def get(self, key):
+        """Return the map stored under key, or None."""
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.stats["memoryHits"] += 1
+            return self.memory[key]
+
+        filename = self.filename(key)
+        if filename is not None and os.path.exists(filename):
+            try:
+                points = np.load(filename)
+            except (OSError, ValueError):
+                # Removed or damaged by another process; compute it again
+                points = None
+            else:
+                # Mark the file as recently used and keep it in memory too
+                # (the map was loaded, so it doesn't matter if another
+                # process has removed the file since)
+                points.flags.writeable = False
+                try:
+                    os.utime(filename)
+                except FileNotFoundError:
+                    pass
+                self.stats["diskHits"] += 1
+                self.remember(key, points)
+                return points
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, key, points):
+        """Store a map under key and return it as a read-only array."""
+        points = np.array(points)
+        points.flags.writeable = False
+        self.remember(key, points)
+
+        filename = self.filename(key)
+        if filename is not None:
+            # Write to a temporary file first so no one reads half a map
+            # (each writer gets its own, so two sessions saving the same
+            # map at once never write into the same file)
+            handle, temporary = tempfile.mkstemp(
+                suffix=".tmp.npy", prefix=key + ".", dir=self.directory)
+            try:
+                with os.fdopen(handle, "wb") as f:
+                    np.save(f, points)
+                os.replace(temporary, filename)
+            except BaseException:
+                os.remove(temporary)
+                raise
+            self.evictDisk()
+
+        return points
+
+    def remember(self, key, points):
+        """Hold a map in memory, forgetting the least recently used ones."""
+        if points.nbytes > self.maxMemoryBytes:
+            return
+
+        if key in self.memory:
+            self.memoryBytes -= self.memory.pop(key).nbytes
+        self.memory[key] = points
+        self.memoryBytes += points.nbytes
+
+        while self.memoryBytes > self.maxMemoryBytes:
+            _, old = self.memory.popitem(last=False)
+            self.memoryBytes -= old.nbytes
+            self.stats["memoryEvictions"] += 1
+
+    def evictDisk(self):
+        """Remove maps from disk which are too old or take too much space."""
+        if self.directory is None:
+            return
+
+        # List the maps, least recently used first
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".npy") and not name.endswith(".tmp.npy"):
+                try:
+                    info = os.stat(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    continue
+                files.append((info.st_mtime, info.st_size, name))
+        files.sort()
+
+        now = time.time()
+        totalBytes = sum(size for _, size, _ in files)
+        for mtime, size, name in files:
+            if totalBytes <= self.maxDiskBytes and now - mtime <= self.maxAge:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            totalBytes -= size
+            self.stats["diskEvictions"] += 1
+
+    def filename(self, key):
+        """Return the name of the file for key, or None if not on disk."""
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, key + ".npy")
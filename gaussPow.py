@@ -10,49 +10,1171 @@ where tx and ty are the parametric equations for the Lissajous figure
 (i.e. tx(t) and ty(t)), and sx and sy are widths of the laser spot in the x
 an y directions. To find the energy distribution as a function of position
 (x,y), the above power distribution must be integrated with respect to t.
+
+Classes
+-------
+ExpTable: Works out exp(u) by interpolating in a table, as a kernel for
+    the engines in place of np.exp
+
+Functions
+---------
+trapeziumWeights(n, dt): The trapezium rule weights for n samples
+lissajousFigure(t, xFreq, yFreq, delta): The Lissajous figure at times t
+fundamentalPeriod(xFreq, yFreq, tolerance, maxDenominator): The time it
+    takes the Lissajous figure to close
+spotCoefficients(sigma2X, sigma2Y, spotAngle): The coefficients of the
+    quadratic form in the exponent of the (possibly rotated) Gaussian
+energyMap(x, y, tx, ty, dt, sigma2X, sigma2Y, ...): Integrate the power
+    distribution over t for every point of an (x,y) grid
+directEnergy(x, y, tx, ty, w, coeffs, memoryBudget): The general engine,
+    which evaluates the power at every pixel
+separableEnergy(x, y, tx, ty, w, coeffs, memoryBudget): The fast engine for
+    separable spots, which integrates with a matrix product
+splatEnergy(x, y, tx, ty, w, coeffs, memoryBudget, radius): The engine which
+    only updates the pixels near the beam at each value of t
+footprintSize(coeffs, hx, hy, radius): The size of the box around the spot
+addFootprints(points, x0, hx, y0, hy, tx, ty, w, coeffs, kx, ky, ...): Add
+    the footprint of the spot at each value of t into an image
+fftEnergy(x, y, tx, ty, w, coeffs, memoryBudget, radius, oversample): The
+    engine which convolves a histogram of the beam position with the spot
+compareEngines(x, y, tx, ty, dt, sigma2X, sigma2Y, engine, reference, ...):
+    The largest difference between the maps from two engines
+gridSpacing(x, default): The first value and spacing of an evenly spaced
+    grid
+gridSpacings(x, y, coeffs, spacing): The first values and spacings of both
+    axes, even if one has only one point
+truncationError(radius, w): The error bound for the truncated engines
+selectEngine(engine, coeffs, radius, oversample, kernel, spacing): Choose
+    the engine function
+adaptiveEnergyMap(x, y, sigma2X, sigma2Y, ..., tolerance, ...): Integrate
+    over one period, or with Romberg integration, until the map converges
+parallelEnergyMap(x, y, tx, ty, dt, sigma2X, sigma2Y, workers, tileSize, ...):
+    Integrate tiles of the grid in a pool of processes
+outOfCoreEnergyMap(filename, x, y, tx, ty, dt, sigma2X, sigma2Y, ...):
+    Integrate a tile at a time into a file, in float32 by default
+windowedEnergyMaps(x, y, sigma2X, sigma2Y, ..., dt, window, duration, ...):
+    Yield the energy deposited in each successive window of time
+axisFactors(x, freq, phase, dt, coeff, maxBytes, kernel): The factors of
+    the power along one axis for every step of a cycle
+commensurateStep(xFreq, yFreq, dt): The largest step, no more than dt,
+    which fits a whole number of times into a cycle of each axis
 """
 
+import fractions
+import functools
+import os
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
 import numpy as np
-import matplotlib.pyplot as plt
-
-# Define constants to use
-numPoints = 201  # The resulting image will be of size numPoints x numPoints
-dt = 0.001       # The step size to use in the numerical integration
-sigma2X = 0.005  # The spot-size in the x-direction of the laser
-sigma2Y = 0.005  # The spot-size in the y-direction of the laser
-
-# Create the image array
-points = np.zeros((numPoints, numPoints))
-
-# Initialise the arrays for values of x, y and t
-x = np.linspace(-1, 1, numPoints)
-y = np.linspace(-1, 1, numPoints)
-t = np.arange(0, 2 * np.pi, dt)
-
-# Calculate the Lissajous figure
-tx = np.sin(t)
-ty = np.sin(t + np.pi / 2)
-# (tx and ty should have the same dimensions as t)
-
-# Run the numerical integration to find the energy distribution
-# First calculate the power distribution at a particular point (x,y)
-# Then calculate the energy transferred at that point
-# by integrating with respect to t
-# The energy distribution is given by repeating this procedure for all (x,y)
-for i in range(len(x)):
-    expX = (x[i] - tx)**2 / sigma2X
-    for j in range(len(y)):
-        expY = (y[j] - ty)**2 / sigma2Y
-
-        # Calculate the power distribution at this particular position (x,y)
-        # for all values of t
-        pwr = np.exp(-0.5 * (expX + expY))
-
-        # Carry out the trapezium rule
-        points[j][i] = dt * (np.sum(pwr[1:-1]) + (pwr[0] + pwr[-1]) / 2)
-
-# Plot the resulting energy distribution
-fig, ax = plt.subplots()
-ax.imshow(points, interpolation="bilinear", origin="lower")  # Plot
-ax.set_axis_off()
-plt.show()
+
+
+def trapeziumWeights(n, dt):
+    """Return the trapezium rule weights for n samples spaced dt apart."""
+    w = np.full(n, dt)
+    w[0] /= 2
+    w[-1] /= 2
+    return w
+
+
+def lissajousFigure(t, xFreq=1, yFreq=1, delta=np.pi / 2):
+    """Return the coordinates tx, ty of the Lissajous figure at times t."""
+    return np.sin(xFreq * t), np.sin(yFreq * t + delta)
+
+
+def fundamentalPeriod(xFreq, yFreq, tolerance=1e-9, maxDenominator=1000):
+    """
+    Return the time it takes the Lissajous figure to close, or None.
+
+    If xFreq / yFreq is the fraction p / q in its lowest terms, both
+    sinusoids repeat after q cycles of the y frequency, so the figure
+    closes after 2 * pi * q / yFreq. The ratio is approximated by the
+    fraction with the smallest denominator, up to maxDenominator, within a
+    relative tolerance; if there isn't one the figure never closes and
+    None is returned. If one frequency is zero that axis stands still, so
+    the figure closes with the other; if both are, None is returned.
+    """
+    if yFreq == 0:
+        return 2 * np.pi / abs(xFreq) if xFreq else None
+
+    ratio = xFreq / yFreq
+    fraction = fractions.Fraction(ratio).limit_denominator(maxDenominator)
+    if abs(fraction - ratio) > tolerance * abs(ratio):
+        return None
+
+    # Find the smallest denominator within the tolerance
+    for q in range(1, fraction.denominator + 1):
+        p = round(ratio * q)
+        if p and abs(p / q - ratio) <= tolerance * abs(ratio):
+            break
+    return 2 * np.pi * q / abs(yFreq)
+
+
+def spotCoefficients(sigma2X, sigma2Y, spotAngle=0):
+    """
+    Return the coefficients of the quadratic form in the Gaussian exponent.
+
+    The spot-sizes are measured along the axes of the spot, which are
+    rotated anticlockwise by spotAngle radians. The exponent is then
+
+        -0.5(a(x - tx)^2 + 2b(x - tx)(y - ty) + c(y - ty)^2),
+
+    and the Gaussian is separable into a product of x and y factors
+    whenever b is zero.
+    """
+    cos = np.cos(spotAngle)
+    sin = np.sin(spotAngle)
+    a = cos**2 / sigma2X + sin**2 / sigma2Y
+    b = cos * sin * (1 / sigma2X - 1 / sigma2Y)
+    c = sin**2 / sigma2X + cos**2 / sigma2Y
+
+    # Rounding in cos and sin leaves a tiny cross term when the spot is
+    # turned through a multiple of pi / 2, so treat that as separable too
+    if abs(b) <= 1e-12 * max(a, c):
+        b = 0.0
+
+    # Plain floats don't change the precision of the arrays they multiply
+    return float(a), float(b), float(c)
+
+
+def energyMap(x, y, tx, ty, dt, sigma2X, sigma2Y, memoryBudget=2**26,
+              spotAngle=0, engine="auto", radius=4, oversample=4,
+              periodic=False, kernel=np.exp):
+    """
+    Integrate the power distribution over t for every (x,y) on a grid.
+
+    Parameters
+    ----------
+    x: Array of x positions; the columns of the image
+    y: Array of y positions; the rows of the image
+    tx: x coordinate of the Lissajous figure at each value of t
+    ty: y coordinate of the Lissajous figure at each value of t
+    dt: The step size to use in the numerical integration
+    sigma2X: The spot-size in the x-direction of the laser
+    sigma2Y: The spot-size in the y-direction of the laser
+    memoryBudget: The maximum number of bytes to use for each block
+    spotAngle: The angle, in radians, the laser spot is rotated through
+    engine: "direct" evaluates the power at every pixel for blocks of
+            pixels at once; "separable" factorises the Gaussian and
+            integrates with a single matrix product; "splat" adds the
+            footprint of the spot around each point of the figure into
+            the image; "fft" convolves the time the beam spends at each
+            point with the spot; "auto" uses "separable" whenever the spot
+            allows it
+    radius: Number of standard deviations at which the "splat" and "fft"
+            engines truncate the spot (see truncationError())
+    oversample: Number of histogram bins per pixel, in each direction,
+                used by the "fft" engine
+    periodic: If True, t covers exactly one period of the figure without
+              repeating the end point (see fundamentalPeriod()), so every
+              value of t has the same weight dt
+    kernel: The function used to work out exp(u) of the exponents, which
+            are never positive; np.exp, or an ExpTable to look the values
+            up in a table instead
+
+    Returns
+    -------
+    points: Array of shape (len(y), len(x)) holding the energy distribution
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    tx = np.asarray(tx, dtype=float)
+    ty = np.asarray(ty, dtype=float)
+
+    w = np.full(len(tx), dt) if periodic else trapeziumWeights(len(tx), dt)
+    coeffs = spotCoefficients(sigma2X, sigma2Y, spotAngle)
+    integrate = selectEngine(engine, coeffs, radius, oversample, kernel)
+    return integrate(x, y, tx, ty, w, coeffs, memoryBudget)
+
+
+def selectEngine(engine, coeffs, radius=4, oversample=4, kernel=np.exp,
+                 spacing=None):
+    """
+    Return the engine function to use for a spot with the given coeffs.
+
+    spacing, if given, is the (hx, hy) of the grid which the "splat" and
+    "fft" engines use for an axis with only one point (see gridSpacings()).
+    """
+    if engine == "splat":
+        return functools.partial(splatEnergy, radius=radius, kernel=kernel,
+                                 spacing=spacing)
+    elif engine == "fft":
+        return functools.partial(fftEnergy, radius=radius,
+                                 oversample=oversample, kernel=kernel,
+                                 spacing=spacing)
+    elif engine == "auto":
+        engine = "direct" if coeffs[1] else "separable"
+
+    if engine == "direct":
+        return functools.partial(directEnergy, kernel=kernel)
+    elif engine == "separable":
+        if coeffs[1]:
+            raise ValueError("A rotated elliptical spot is not separable")
+        return functools.partial(separableEnergy, kernel=kernel)
+    else:
+        raise ValueError("Unknown engine: " + str(engine))
+
+
+def directEnergy(x, y, tx, ty, w, coeffs, memoryBudget=2**26,
+                 kernel=np.exp):
+    """
+    Integrate the power distribution by evaluating it at every pixel.
+
+    The power distribution is evaluated for whole blocks of pixels at once.
+    The size of each block is chosen so the (rows, columns, t) array of
+    powers, together with the (columns, t) and (rows, t) arrays of
+    offsets it is built from, never uses more than memoryBudget bytes.
+    The integral is the dot product of the powers with the quadrature
+    weights w. The calculation is done in the precision of the x and tx
+    arrays.
+    """
+    a, b, c = coeffs
+    points = np.zeros((len(y), len(x)), dtype=np.result_type(x, tx))
+
+    # Work out how many rows of len(tx) values fit in the memory budget.
+    # Each block of columns holds dx and expX, each block of rows holds dy
+    # and expY, and the cross term of a rotated spot needs a second block
+    # of powers, so give at most a quarter of the budget to the columns
+    # and fill what is left with rows
+    numRows = max(1, int(memoryBudget) // (tx.itemsize * len(tx)))
+    numBlocks = 2 if b else 1
+    blockX = max(1, min(len(x), numRows // 4))
+    blockY = (numRows - 2 * blockX) // (numBlocks * blockX + 2)
+    blockY = max(1, min(len(y), blockY))
+
+    for i in range(0, len(x), blockX):
+        dx = x[i:i + blockX, None] - tx
+        expX = np.square(dx)
+        expX *= a
+        for j in range(0, len(y), blockY):
+            dy = y[j:j + blockY, None] - ty
+            expY = np.square(dy)
+            expY *= c
+
+            # Calculate the power distribution for the whole block of
+            # positions (x,y) for all values of t
+            pwr = expY[:, None, :] + expX[None, :, :]
+            if b:
+                pwr += 2 * b * dy[:, None, :] * dx[None, :, :]
+            pwr *= -0.5
+            kernel(pwr, out=pwr)
+
+            # Carry out the quadrature for every pixel in the block
+            points[j:j + blockY, i:i + blockX] = pwr @ w
+
+    return points
+
+
+def separableEnergy(x, y, tx, ty, w, coeffs, memoryBudget=2**26,
+                    kernel=np.exp):
+    """
+    Integrate the power distribution of a separable spot as a matrix product.
+
+    When there is no cross term the power factorises into
+    exp(-0.5a(x - tx)^2) * exp(-0.5c(y - ty)^2), so the integral over t is
+    Ey^T W Ex, where Ex and Ey hold the x and y factors at every t and W
+    holds the quadrature weights w on its diagonal. Only (len(x) + len(y))
+    exponentials are needed for each value of t. The calculation is done
+    in the precision of the x and tx arrays.
+    """
+    a, b, c = coeffs
+    points = np.zeros((len(y), len(x)), dtype=np.result_type(x, tx))
+
+    # Split the axes so that each block of factors fits in the memory budget
+    # (the factors are built in place in two reusable buffers, and the
+    # weights are folded into the x factor, so nothing else of that size
+    # is ever held)
+    block = max(1, int(memoryBudget) // (2 * points.itemsize * len(tx)))
+    factors = np.empty((2, min(block, max(len(x), len(y))), len(tx)),
+                       dtype=points.dtype)
+
+    for i in range(0, len(x), block):
+        ex = factors[0, :len(x[i:i + block])]
+        np.subtract(x[i:i + block, None], tx, out=ex)
+        np.square(ex, out=ex)
+        ex *= -0.5 * a
+        kernel(ex, out=ex)
+        ex *= w
+        for j in range(0, len(y), block):
+            ey = factors[1, :len(y[j:j + block])]
+            np.subtract(y[j:j + block, None], ty, out=ey)
+            np.square(ey, out=ey)
+            ey *= -0.5 * c
+            kernel(ey, out=ey)
+            points[j:j + block, i:i + block] = ey @ ex.T
+
+    return points
+
+
+def splatEnergy(x, y, tx, ty, w, coeffs, memoryBudget=2**26, radius=4,
+                kernel=np.exp, spacing=None):
+    """
+    Integrate the power distribution by walking along the Lissajous figure.
+
+    The spot is effectively zero more than a few standard deviations away
+    from the beam, so for each value of t only the pixels in a box around
+    (tx, ty) are updated. The box holds every pixel within radius standard
+    deviations of the beam, so the cost depends on the number of values of
+    t and the size of the spot rather than on the size of the image.
+    The pixels left out each contribute less than exp(-0.5 * radius^2) of
+    the peak power; truncationError() gives the resulting error bound.
+
+    The x and y arrays must be evenly spaced; spacing is the (hx, hy) to
+    use for an axis with only one point (see gridSpacings()).
+    """
+    points = np.zeros((len(y), len(x)))
+    if len(x) == 0 or len(y) == 0:
+        return points
+
+    x0, hx, y0, hy = gridSpacings(x, y, coeffs, spacing)
+    kx, ky = footprintSize(coeffs, hx, hy, radius)
+    addFootprints(points, x0, hx, y0, hy, tx, ty, w, coeffs,
+                  min(kx, len(x) - 1), min(ky, len(y) - 1), memoryBudget,
+                  kernel)
+    return points
+
+
+def footprintSize(coeffs, hx, hy, radius=4):
+    """
+    Return the half-widths, in pixels, of the box around the spot.
+
+    The box holds the ellipse of points radius standard deviations from
+    the beam, plus half a pixel to allow for rounding the beam to a pixel.
+    """
+    a, b, c = coeffs
+    det = a * c - b**2
+    kx = int(np.ceil(radius * np.sqrt(c / det) / abs(hx) + 0.5))
+    ky = int(np.ceil(radius * np.sqrt(a / det) / abs(hy) + 0.5))
+    return kx, ky
+
+
+def addFootprints(points, x0, hx, y0, hy, tx, ty, w, coeffs, kx, ky,
+                  memoryBudget=2**26, kernel=np.exp):
+    """
+    Add the footprint of the spot at each (tx, ty) into an image.
+
+    The image points is an evenly spaced grid, whose pixel (j, i) is at
+    (x0 + i * hx, y0 + j * hy). Each footprint is the power of the spot,
+    times the quadrature weight w, over the box of 2kx + 1 by 2ky + 1
+    pixels around the pixel of the image nearest the beam (see
+    footprintSize()); the pixels off the edge of the image are left out.
+    This is the inner loop of splatEnergy(), and is also used to add to an
+    image a few values of t at a time.
+    """
+    a, b, c = coeffs
+    height, width = points.shape
+    offsetX = np.arange(-kx, kx + 1)
+    offsetY = np.arange(-ky, ky + 1)
+
+    # Split t into chunks whose footprints fit in the memory budget
+    footprint = len(offsetX) * len(offsetY)
+    chunk = max(1, int(memoryBudget) // (4 * 8 * footprint))
+
+    flat = points.ravel()
+    for k in range(0, len(tx), chunk):
+        # Find the pixels in the box around the beam for each value of t
+        # (a beam off the image is moved to its edge, so that a box which
+        # is cut down to the size of the image still reaches every pixel)
+        i = np.clip(np.rint((tx[k:k + chunk] - x0) / hx), 0, width - 1)
+        j = np.clip(np.rint((ty[k:k + chunk] - y0) / hy), 0, height - 1)
+        i = i.astype(int)[:, None]
+        j = j.astype(int)[:, None]
+        i = i + offsetX
+        j = j + offsetY
+        dx = x0 + i * hx - tx[k:k + chunk, None]
+        dy = y0 + j * hy - ty[k:k + chunk, None]
+
+        # Calculate the power in each box
+        # The x and y factors only need multiplying if there's no cross term
+        if b:
+            pwr = (c * dy**2)[:, :, None] + (a * dx**2)[:, None, :]
+            pwr += 2 * b * dy[:, :, None] * dx[:, None, :]
+            pwr *= -0.5
+            kernel(pwr, out=pwr)
+            pwr *= w[k:k + chunk, None, None]
+        else:
+            ex = kernel(-0.5 * a * dx**2) * w[k:k + chunk, None]
+            ey = kernel(-0.5 * c * dy**2)
+            pwr = ey[:, :, None] * ex[:, None, :]
+
+        # Add the boxes into the image, leaving out the pixels off the edge
+        inside = (((i >= 0) & (i < width))[:, None, :] &
+                  ((j >= 0) & (j < height))[:, :, None])
+        index = j[:, :, None] * width + i[:, None, :]
+        np.add.at(flat, index[inside], pwr[inside])
+
+
+def fftEnergy(x, y, tx, ty, w, coeffs, memoryBudget=2**26, radius=4,
+              oversample=4, kernel=np.exp, spacing=None):
+    """
+    Integrate the power distribution as a convolution.
+
+    The energy distribution is the time the beam spends at each point
+    (its dwell time) convolved with the spot. The dwell time is found by
+    sharing each quadrature weight between the four nearest bins of a
+    histogram with oversample bins per pixel in each direction. The
+    histogram is then convolved with the spot, truncated at radius
+    standard deviations, using the FFT. The cost depends on the size of
+    the image and barely at all on the number of values of t.
+
+    The x and y arrays must be evenly spaced; spacing is the (hx, hy) to
+    use for an axis with only one point (see gridSpacings()), so that the
+    tiles of a larger grid are binned in the same way as the whole grid.
+    The histogram is padded by the width of the spot so that beam
+    positions just off the image are still counted. memoryBudget is not
+    used; it is accepted so that all the engines can be called in the
+    same way.
+    """
+    a, b, c = coeffs
+    if len(x) == 0 or len(y) == 0:
+        return np.zeros((len(y), len(x)))
+
+    x0, hx, y0, hy = gridSpacings(x, y, coeffs, spacing)
+    hx /= oversample
+    hy /= oversample
+
+    # Work out the half-widths, in bins, of the box around the spot
+    det = a * c - b**2
+    kx = int(np.ceil(radius * np.sqrt(c / det) / abs(hx)))
+    ky = int(np.ceil(radius * np.sqrt(a / det) / abs(hy)))
+
+    # The histogram covers the image plus a border the width of the spot
+    nx = (len(x) - 1) * oversample + 1 + 2 * kx
+    ny = (len(y) - 1) * oversample + 1 + 2 * ky
+
+    # Share each weight between the four nearest bins (bilinear deposition)
+    u = (tx - x0) / hx + kx
+    v = (ty - y0) / hy + ky
+    i = np.floor(u).astype(int)
+    j = np.floor(v).astype(int)
+    fx = u - i
+    fy = v - j
+    hist = np.zeros(ny * nx)
+    for di, wx in ((0, 1 - fx), (1, fx)):
+        for dj, wy in ((0, 1 - fy), (1, fy)):
+            inside = ((i + di >= 0) & (i + di < nx) &
+                      (j + dj >= 0) & (j + dj < ny))
+            hist += np.bincount(((j + dj) * nx + i + di)[inside],
+                                weights=(w * wx * wy)[inside],
+                                minlength=ny * nx)
+    hist = hist.reshape(ny, nx)
+
+    # Sample the spot on the histogram grid
+    dx = np.arange(-kx, kx + 1) * hx
+    dy = np.arange(-ky, ky + 1) * hy
+    spot = kernel(-0.5 * (c * dy[:, None]**2 + 2 * b * dy[:, None] * dx +
+                          a * dx**2))
+
+    # Carry out the convolution, padding to avoid wrapping round
+    shape = (ny + 2 * ky, nx + 2 * kx)
+    full = np.fft.irfft2(np.fft.rfft2(hist, shape) *
+                         np.fft.rfft2(spot, shape), shape)
+
+    # Pick out the bins at the centres of the pixels
+    # (bin p of the histogram is at index p + k of the full convolution)
+    return full[2 * ky:2 * ky + len(y) * oversample:oversample,
+                2 * kx:2 * kx + len(x) * oversample:oversample]
+
+
+def compareEngines(x, y, tx, ty, dt, sigma2X, sigma2Y, engine,
+                   reference="direct", **options):
+    """
+    Return the largest difference between the maps from two engines.
+
+    The remaining keyword arguments are passed on to energyMap() for both
+    engines. This is used to check the approximate engines, such as "fft"
+    and "splat", against the direct trapezium rule.
+    """
+    points = energyMap(x, y, tx, ty, dt, sigma2X, sigma2Y, engine=engine,
+                       **options)
+    expected = energyMap(x, y, tx, ty, dt, sigma2X, sigma2Y,
+                         engine=reference, **options)
+    return np.max(np.abs(points - expected))
+
+
+def gridSpacing(x, default=None):
+    """
+    Return the first value and spacing of an evenly spaced array.
+
+    An array with only one point has no spacing, so default is returned
+    as its spacing. The steps may differ by the rounding error of the
+    values, so float32 grids are accepted as well as float64 ones.
+    """
+    if len(x) == 1:
+        return x[0], default
+
+    h = (x[-1] - x[0]) / (len(x) - 1)
+    eps = np.finfo(np.result_type(x, 1.0)).eps
+    rounding = 4 * eps * max(abs(x[0]), abs(x[-1]))
+    if h == 0 or not np.allclose(np.diff(x), h, rtol=1e-6, atol=rounding):
+        raise ValueError("The grid must be evenly spaced")
+    return x[0], h
+
+
+def gridSpacings(x, y, coeffs, spacing=None):
+    """
+    Return x0, hx, y0 and hy for the evenly spaced x and y arrays.
+
+    An axis with only one point, such as the last row of tiles cut from a
+    grid, takes its spacing from spacing, the (hx, hy) of the whole grid,
+    if it is given. Otherwise it takes the spacing of the other axis, or
+    if both have only one point, the standard deviations of the spot.
+    """
+    hx, hy = (None, None) if spacing is None else spacing
+    x0, hx = gridSpacing(x, hx)
+    y0, hy = gridSpacing(y, hy)
+
+    if hx is None and hy is None:
+        a, b, c = coeffs
+        det = a * c - b**2
+        hx, hy = np.sqrt(c / det), np.sqrt(a / det)
+    elif hx is None:
+        hx = abs(hy)
+    elif hy is None:
+        hy = abs(hx)
+    return x0, hx, y0, hy
+
+
+def truncationError(radius, w):
+    """
+    Return the error bound for truncating the spot at radius deviations.
+
+    No pixel misses more than exp(-0.5 * radius^2) of the peak power at any
+    value of t, so the energy at every pixel is underestimated by no more
+    than this times the sum of the quadrature weights w. The "fft" engine
+    has a further error from binning the beam position, which shrinks
+    with the square of the bin size.
+    """
+    return np.exp(-0.5 * radius**2) * np.sum(w)
+
+
+class ExpTable():
+    """
+    Evaluate exp(u), for u <= 0, by interpolating in a table.
+
+    The exponentials in the engines are all of the form exp(-0.5 * q),
+    where q >= 0 is the quadratic form of the spot, and the spot is
+    negligible once q is large. So exp(u) is tabulated at evenly spaced
+    points from u = 0 down to a cutoff, below which it is taken as zero,
+    and looked up with linear (order 1) or cubic (order 3) interpolation.
+    Each interval of the table holds the coefficients of a polynomial in
+    the position within the interval, so a value takes one lookup
+    (np.take) and order multiply-adds.
+
+    The table is made just fine enough, and the cutoff just low enough,
+    for every value to be within tolerance of exp(u); this is checked
+    when the table is made (see measureError()). A map integrated with
+    the table is then within tolerance * sum(w) of one integrated with
+    np.exp, as for truncationError(). Alternatively the number of
+    intervals can be given, and maxError shows how accurate it is.
+
+    An ExpTable can be passed as the kernel of any of the energy maps in
+    place of np.exp. It must only be called with u <= 0. Whether it is
+    faster depends on the machine: where NumPy's np.exp uses SIMD
+    instructions it is usually quicker than the lookup, so compare them
+    with python lissajousBench.py --groups kernel.
+
+    Parameters
+    ----------
+    tolerance: The largest error to allow in exp(u)
+    order: 1 for linear interpolation, or 3 for cubic
+    size: The number of intervals in the table; if given, tolerance only
+          sets the cutoff
+    chunkSize: Number of values to work out at once, to keep the
+               temporary arrays small
+
+    Variables
+    ---------
+    tolerance: The largest error allowed in exp(u)
+    order: 1 for linear interpolation, or 3 for cubic
+    cutoff: exp(u) is taken as zero for u below -cutoff
+    step: The spacing of the points of the table
+    size: The number of intervals in the table
+    coefficients: Array of shape (size, order + 1) holding the polynomial
+                  for each interval, lowest power first
+    maxError: The largest error found by measureError()
+    chunkSize: Number of values to work out at once
+
+    Methods
+    -------
+    makeTable(self, size): Work out the coefficients for size intervals
+    __call__(self, u, out): exp(u), like np.exp(u, out=out)
+    measureError(self): The largest error over the whole table
+    """
+
+    def __init__(self, tolerance=1e-6, order=1, size=None, chunkSize=2**14):
+        """Make the table, refining it until it is within tolerance."""
+        if order not in (1, 3):
+            raise ValueError("The order must be 1 or 3")
+        self.tolerance = tolerance
+        self.order = order
+        self.chunkSize = chunkSize
+
+        # Half the tolerance is left for the cutoff, half for the
+        # interpolation, whose error is at most h^2 / 8 for linear and
+        # 3h^4 / 128 for cubic interpolation (as |exp(u)| <= 1)
+        self.cutoff = np.log(2 / tolerance)
+        bRefine = size is None
+        if bRefine:
+            if order == 1:
+                step = np.sqrt(8 * tolerance / 2)
+            else:
+                step = (128 * tolerance / 2 / 3)**0.25
+            size = int(np.ceil(self.cutoff / step))
+        self.makeTable(size)
+        self.maxError = self.measureError()
+
+        # Rounding can leave the table a little short of the tolerance
+        while bRefine and self.maxError > tolerance:
+            self.makeTable(self.size * 2)
+            self.maxError = self.measureError()
+
+    def makeTable(self, size):
+        """Work out the coefficients for a table of size intervals."""
+        self.size = size
+        self.step = self.cutoff / size
+
+        # The values at the points of the table, with one point before
+        # the start and two after the end for cubic interpolation;
+        # the last points are zero, so the values fall to zero at the cutoff
+        k = np.arange(-1, size + 2)
+        values = np.exp(-k * self.step)
+        values[k >= size] = 0
+
+        if self.order == 1:
+            y1, y2 = values[1:-2], values[2:-1]
+            self.coefficients = np.column_stack((y1, y2 - y1))
+        else:
+            # The cubic through the points either side of each interval
+            y0, y1, y2, y3 = (values[:-3], values[1:-2], values[2:-1],
+                              values[3:])
+            self.coefficients = np.column_stack((
+                y1,
+                -y0 / 3 - y1 / 2 + y2 - y3 / 6,
+                y0 / 2 - y1 + y2 / 2,
+                (y3 - y0) / 6 + (y1 - y2) / 2))
+
+    def __call__(self, u, out=None):
+        """Return exp(u) for an array of u <= 0, like np.exp(u, out=out)."""
+        u = np.asarray(u)
+        if out is None:
+            out = np.empty_like(u, dtype=np.result_type(u, np.float32))
+        elif not out.flags.c_contiguous:
+            raise ValueError("out must be contiguous")
+        flatU = u.reshape(-1)
+        flatOut = out.reshape(-1)
+
+        scale = -1 / self.step
+        for k in range(0, flatU.size, self.chunkSize):
+            # Find the interval of each value and the position within it
+            v = flatU[k:k + self.chunkSize] * scale
+            np.minimum(v, self.size, out=v)
+            i = v.astype(np.intp)
+            np.minimum(i, self.size - 1, out=i)
+            v -= i
+
+            # Evaluate the polynomial of the interval, highest power first
+            rows = np.take(self.coefficients, i, axis=0)
+            result = rows[:, self.order] * v
+            for power in range(self.order - 1, 0, -1):
+                result += rows[:, power]
+                result *= v
+            result += rows[:, 0]
+            flatOut[k:k + self.chunkSize] = result
+
+        return out
+
+    def measureError(self):
+        """
+        Return the largest error in exp(u) over the table and beyond.
+
+        The values are compared with np.exp at several points in every
+        interval, where the interpolation error is largest, and past the
+        cutoff, where the error is the value ignored.
+        """
+        fractions = np.array([0, 0.1, 0.25, 0.5, 0.75, 0.9])
+        u = -(np.arange(self.size)[:, None] + fractions).ravel() * self.step
+        u = np.concatenate((u, [-self.cutoff, -self.cutoff * 1.5]))
+        return float(np.max(np.abs(self(u) - np.exp(u))))
+
+
+def adaptiveEnergyMap(x, y, sigma2X, sigma2Y, xFreq=1, yFreq=1,
+                      delta=np.pi / 2, tEnd=None, tolerance=1e-6,
+                      minSamples=65, maxSamples=2**20 + 1,
+                      memoryBudget=2**26, spotAngle=0, engine="auto",
+                      radius=4, oversample=4, kernel=np.exp):
+    """
+    Integrate the power distribution from t = 0 to tEnd to a set tolerance.
+
+    The number of steps of the trapezium rule is doubled until the results
+    stop changing. Each doubling only needs the power at the new midpoints,
+    so none of the earlier work is thrown away.
+
+    If tEnd is None and the figure closes, exactly one period is
+    integrated (see fundamentalPeriod()). The power is then periodic and
+    smooth, and the trapezium rule converges exponentially fast. Otherwise
+    Romberg integration is used: Richardson extrapolation removes the
+    leading error terms of the trapezium rule.
+
+    Parameters
+    ----------
+    xFreq: The x angular frequency of the Lissajous figure
+    yFreq: The y angular frequency of the Lissajous figure
+    delta: The phase shift of the Lissajous figure, in radians
+    tEnd: The time to integrate up to; if None, one period of the figure,
+          or 2 * pi if the figure never closes
+    tolerance: The target error, relative to the peak of the energy map
+    minSamples: The number of values of t to start with
+    maxSamples: The most values of t to use before giving up
+
+    The remaining parameters are the same as for energyMap().
+
+    Returns
+    -------
+    points: Array of shape (len(y), len(x)) holding the energy distribution
+    error: Estimate of the error in points, relative to its peak
+    numSamples: The number of values of t used
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    coeffs = spotCoefficients(sigma2X, sigma2Y, spotAngle)
+    integrate = selectEngine(engine, coeffs, radius, oversample, kernel)
+
+    def power(t, dt):
+        """Integrate over the given values of t, all with the weight dt."""
+        tx, ty = lissajousFigure(t, xFreq, yFreq, delta)
+        w = np.full(len(t), dt)
+        return integrate(x, y, tx, ty, w, coeffs, memoryBudget)
+
+    periodic = False
+    if tEnd is None:
+        tEnd = fundamentalPeriod(xFreq, yFreq)
+        periodic = tEnd is not None
+        if not periodic:
+            tEnd = 2 * np.pi
+
+    # Start with the trapezium rule for minSamples values of t
+    # (over a period the end point is the same as the start point)
+    numSteps = max(1, minSamples - 1)
+    dt = tEnd / numSteps
+    if periodic:
+        trapezium = power(np.arange(numSteps) * dt, dt)
+    else:
+        t = np.linspace(0, tEnd, numSteps + 1)
+        trapezium = power(t, dt) - power(t[[0, -1]], dt / 2)
+    row = [trapezium]
+    error = np.inf
+
+    while numSteps * 2 + (not periodic) <= maxSamples:
+        # Halve the step size, adding the power at the midpoints
+        numSteps *= 2
+        dt /= 2
+        t = (np.arange(numSteps // 2) * 2 + 1) * dt
+        trapezium = trapezium / 2 + power(t, dt)
+
+        # Extrapolate to remove the leading error terms
+        # This would only add rounding errors to the periodic rule
+        newRow = [trapezium]
+        for k, previous in enumerate(row if not periodic else [], 1):
+            newRow.append(newRow[-1] +
+                          (newRow[-1] - previous) / (4**k - 1))
+
+        # Compare with the best estimate from the previous step size
+        peak = np.max(np.abs(newRow[-1]))
+        error = np.max(np.abs(newRow[-1] - row[-1])) / (peak or 1)
+        row = newRow
+        if error <= tolerance:
+            break
+
+    return row[-1], error, numSteps + (not periodic)
+
+
+def parallelEnergyMap(x, y, tx, ty, dt, sigma2X, sigma2Y, workers=None,
+                      tileSize=64, memoryBudget=2**26, spotAngle=0,
+                      engine="auto", radius=4, oversample=4,
+                      periodic=False, kernel=np.exp):
+    """
+    Integrate the power distribution over t using several processes.
+
+    The (x,y) grid is split into tiles of tileSize x tileSize pixels which
+    are handed out to a pool of worker processes. The workers write their
+    results straight into an image held in shared memory, so nothing but
+    the tile positions is sent between processes. Each tile is always
+    integrated in the same way, so the result does not depend on the
+    number of workers.
+
+    Parameters
+    ----------
+    workers: Number of worker processes; defaults to the number of CPUs.
+             With one worker the tiles are integrated in this process
+    tileSize: Width and height of each tile, in pixels
+    memoryBudget: The maximum number of bytes each worker uses per block
+
+    The remaining parameters are the same as for energyMap().
+
+    Returns
+    -------
+    points: Array of shape (len(y), len(x)) holding the energy distribution
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    tx = np.asarray(tx, dtype=float)
+    ty = np.asarray(ty, dtype=float)
+
+    w = np.full(len(tx), dt) if periodic else trapeziumWeights(len(tx), dt)
+    coeffs = spotCoefficients(sigma2X, sigma2Y, spotAngle)
+    selectEngine(engine, coeffs)  # Check the engine before starting a pool
+    spacing = tileSpacing(engine, x, y, coeffs)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    tiles = [(j, i) for j in range(0, len(y), tileSize)
+             for i in range(0, len(x), tileSize)]
+    args = (x, y, tx, ty, w, coeffs, engine, memoryBudget, radius, oversample,
+            tileSize, kernel, spacing)
+
+    if workers == 1 or len(tiles) == 1:
+        points = np.zeros((len(y), len(x)))
+        for tile in tiles:
+            integrateTile(points, tile, *args)
+        return points
+
+    # Create the shared image and let the workers fill it in
+    shape = (len(y), len(x))
+    shm = shared_memory.SharedMemory(create=True,
+                                     size=max(1, 8 * len(y) * len(x)))
+    try:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tiles)),
+                                 initializer=initialiseWorker,
+                                 initargs=(shm.name, shape) + args) as pool:
+            # Consume the results so that any worker errors are raised
+            for _ in pool.map(workerTile, tiles):
+                pass
+
+        points = np.ndarray(shape, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return points
+
+
+def outOfCoreEnergyMap(filename, x, y, tx, ty, dt, sigma2X, sigma2Y,
+                       tileSize=1024, timeChunk=2048, dtype=np.float32,
+                       memoryBudget=2**26, spotAngle=0, engine="auto",
+                       radius=4, oversample=4, periodic=False,
+                       kernel=np.exp):
+    """
+    Integrate the power distribution straight into a file on disk.
+
+    The image is stored in filename as a .npy file and is computed a tile
+    at a time through a memory map, so only one tile needs to be held in
+    memory however large the image is. Within a tile, t is split into
+    chunks of timeChunk values and the integrals over each chunk are
+    added up using compensated (Kahan) summation. This keeps the
+    accuracy of float32 results close to float32 rounding, however many
+    values of t there are.
+
+    Parameters
+    ----------
+    filename: The .npy file to write the energy distribution to
+    tileSize: Width and height of each tile, in pixels
+    timeChunk: Number of values of t to integrate at once
+    dtype: The precision used for the calculation and the result
+
+    The remaining parameters are the same as for energyMap().
+
+    Returns
+    -------
+    points: Memory map of shape (len(y), len(x)) holding the energy
+            distribution
+    peakBytes: The most memory allocated at once while integrating, in
+               bytes (not counting the memory map itself)
+    """
+    # The spacing of the grid is worked out before it is rounded to dtype
+    coeffs = spotCoefficients(sigma2X, sigma2Y, spotAngle)
+    spacing = tileSpacing(engine, np.asarray(x, dtype=float),
+                          np.asarray(y, dtype=float), coeffs)
+
+    x = np.asarray(x, dtype=dtype)
+    y = np.asarray(y, dtype=dtype)
+    tx = np.asarray(tx, dtype=dtype)
+    ty = np.asarray(ty, dtype=dtype)
+
+    w = np.full(len(tx), dt) if periodic else trapeziumWeights(len(tx), dt)
+    w = w.astype(dtype)
+    integrate = selectEngine(engine, coeffs, radius, oversample, kernel,
+                             spacing)
+
+    points = np.lib.format.open_memmap(filename, mode="w+", dtype=dtype,
+                                       shape=(len(y), len(x)))
+
+    # Keep track of the memory used by NumPy from here on
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        tracemalloc.reset_peak()
+    else:
+        tracemalloc.start()
+    startBytes = tracemalloc.get_traced_memory()[0]
+
+    try:
+        for j in range(0, len(y), tileSize):
+            for i in range(0, len(x), tileSize):
+                tileX = x[i:i + tileSize]
+                tileY = y[j:j + tileSize]
+                total = np.zeros((len(tileY), len(tileX)), dtype=dtype)
+                compensation = np.zeros_like(total)
+
+                for k in range(0, len(tx), timeChunk):
+                    part = integrate(tileX, tileY, tx[k:k + timeChunk],
+                                     ty[k:k + timeChunk], w[k:k + timeChunk],
+                                     coeffs, memoryBudget).astype(dtype)
+
+                    # Add on the part, carrying the rounding error
+                    # over to the next part
+                    part -= compensation
+                    newTotal = total + part
+                    compensation = (newTotal - total) - part
+                    total = newTotal
+
+                points[j:j + tileSize, i:i + tileSize] = total
+            points.flush()
+
+        peakBytes = tracemalloc.get_traced_memory()[1] - startBytes
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+    return points, peakBytes
+
+
+def windowedEnergyMaps(x, y, sigma2X, sigma2Y, xFreq=1, yFreq=1,
+                       delta=np.pi / 2, dt=0.001, window=1, duration=None,
+                       out=None, accumulate=False, memoryBudget=2**26,
+                       spotAngle=0, engine="auto", radius=4, oversample=4,
+                       kernel=np.exp):
+    """
+    Yield the energy deposited in each successive window of time.
+
+    The scan from t = 0 to duration is split into windows of length
+    window, and for each one the power distribution is integrated over the
+    window with the trapezium rule (steps of dt), so that the maps of all
+    the windows add up to the map of the whole scan. The maps are made one
+    at a time into the same array, so the memory used does not depend on
+    the duration: a scan of millions of periods can be followed window by
+    window, e.g. by a thermal model. Within a window, t is split into
+    chunks which fit in the memory budget.
+
+    If t is in seconds, xFreq and yFreq are in radians per second, so e.g.
+    window=1e-3 gives the energy deposited in each millisecond.
+
+    For a separable spot, the x and y factors of the power (see
+    separableEnergy()) only depend on where each axis is in its cycle.
+    When a cycle of an axis is a whole number of steps dt, the factors for
+    one cycle are worked out once and then looked up by the step number
+    for every window, rather than being worked out again; see
+    commensurateStep() for a step size which makes this so.
+
+    Parameters
+    ----------
+    dt: The step size to use in the numerical integration
+    window: The length of each window of time; rounded to a whole number
+            of steps dt
+    duration: The time to integrate up to; if None, one period of the
+              figure, or 2 * pi if the figure never closes. The last
+              window is shorter if the windows don't fit exactly
+    out: Array of shape (len(y), len(x)) to hold the maps; made if not
+         given
+    accumulate: If True, the energy of each window is added to out, so
+                that out holds the energy deposited up to the end of the
+                window; otherwise out holds the energy of each window alone
+
+    The remaining parameters are the same as for adaptiveEnergyMap() and
+    energyMap().
+
+    Yields
+    ------
+    tStart: The time at the start of the window
+    tEnd: The time at the end of the window
+    points: out, holding the energy distribution of the window (or up to
+            the end of the window); it is overwritten by the next window,
+            so copy it to keep it
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    coeffs = spotCoefficients(sigma2X, sigma2Y, spotAngle)
+    integrate = selectEngine(engine, coeffs, radius, oversample, kernel)
+
+    if duration is None:
+        duration = fundamentalPeriod(xFreq, yFreq) or 2 * np.pi
+    if out is None:
+        out = np.zeros((len(y), len(x)))
+    elif out.shape != (len(y), len(x)):
+        raise ValueError("out must have shape (len(y), len(x))")
+    numSteps = int(round(duration / dt))
+    stepsPerWindow = max(1, int(round(window / dt)))
+
+    # Only the separable engine is made of x and y factors
+    bSeparable = integrate.func is separableEnergy
+    tableX = tableY = None
+    if bSeparable:
+        tableX = axisFactors(x, xFreq, 0, dt, coeffs[0], memoryBudget // 4,
+                             kernel)
+        tableY = axisFactors(y, yFreq, delta, dt, coeffs[2],
+                             memoryBudget // 4, kernel)
+
+    def factorsAt(steps, table, positions, freq, phase, coeff):
+        """Look up the factors of one axis, or work them out if need be."""
+        if table is not None:
+            return np.take(table, steps % len(table), axis=0)
+        ends = np.sin(freq * (steps * dt) + phase)
+        return kernel(-0.5 * coeff * (positions - ends[:, None])**2)
+
+    # Each chunk of t holds the x and y factors and their weighted copy
+    chunk = max(1, (int(memoryBudget) // 2) //
+                (x.itemsize * (len(x) + 2 * len(y))))
+
+    for start in range(0, numSteps, stepsPerWindow):
+        stop = min(start + stepsPerWindow, numSteps)
+        if not accumulate:
+            out[:] = 0
+
+        # The steps are counted in integers, so t doesn't drift
+        for k in range(start, stop + 1, chunk):
+            steps = np.arange(k, min(k + chunk, stop + 1))
+            w = np.full(len(steps), dt)
+            w[steps == start] /= 2
+            w[steps == stop] /= 2
+
+            if not bSeparable:
+                tx, ty = lissajousFigure(steps * dt, xFreq, yFreq, delta)
+                out += integrate(x, y, tx, ty, w, coeffs, memoryBudget)
+                continue
+
+            ex = factorsAt(steps, tableX, x, xFreq, 0, coeffs[0])
+            ey = factorsAt(steps, tableY, y, yFreq, delta, coeffs[2])
+            out += (ey * w[:, None]).T @ ex
+
+        yield start * dt, stop * dt, out
+
+
+def axisFactors(x, freq, phase, dt, coeff, maxBytes=2**24, kernel=np.exp):
+    """
+    Return the factors of the power along one axis for a cycle, or None.
+
+    Row k holds exp(-0.5 * coeff * (x - sin(freq * k * dt + phase))^2), so
+    that row k % len(rows) gives the factors at step k of any later cycle.
+    None is returned if a cycle isn't a whole number of steps dt (within
+    rounding), or if the rows would take more than maxBytes. An axis whose
+    freq is zero stands still, so it has a single row.
+    """
+    if freq == 0:
+        n = 1
+    else:
+        stepsPerCycle = 2 * np.pi / abs(freq * dt)
+        n = int(round(stepsPerCycle))
+        if n < 1 or abs(n - stepsPerCycle) > 1e-9 * stepsPerCycle:
+            return None
+    if n * len(x) * x.itemsize > maxBytes:
+        return None
+
+    t = np.arange(n) * dt
+    return kernel(-0.5 * coeff * (x - np.sin(freq * t + phase)[:, None])**2)
+
+
+def commensurateStep(xFreq, yFreq, dt):
+    """
+    Return the largest step, no more than dt, which fits the figure's axes.
+
+    A cycle of each axis of the figure is then a whole number of steps, so
+    that windowedEnergyMaps() can look up the factors of the power rather
+    than working them out again. If the figure never closes there is no
+    such step, and dt is returned.
+    """
+    period = fundamentalPeriod(xFreq, yFreq)
+    if period is None:
+        return dt
+
+    # The period holds p cycles of x and q cycles of y, so the number of
+    # steps in it must be a multiple of both (an axis which stands still
+    # has no cycles, and so puts no limit on the step)
+    p = int(round(period * abs(xFreq) / (2 * np.pi)))
+    q = int(round(period * abs(yFreq) / (2 * np.pi)))
+    multiple = int(np.lcm(max(p, 1), max(q, 1)))
+    numSteps = int(np.ceil(period / dt / multiple - 1e-9)) * multiple
+    return period / numSteps
+
+
+def tileSpacing(engine, x, y, coeffs):
+    """
+    Return the (hx, hy) of the whole grid, for the engines which need it.
+
+    The "splat" and "fft" engines need the spacing of the grid, which a
+    tile with only one row or column does not have. The other engines
+    don't, and their grids needn't be evenly spaced, so None is returned.
+    """
+    if engine not in ("splat", "fft") or len(x) == 0 or len(y) == 0:
+        return None
+    _, hx, _, hy = gridSpacings(x, y, coeffs)
+    return hx, hy
+
+
+def integrateTile(points, tile, x, y, tx, ty, w, coeffs, engine,
+                  memoryBudget, radius, oversample, tileSize, kernel=np.exp,
+                  spacing=None):
+    """Integrate one tile of the grid and store it in points."""
+    j, i = tile
+    integrate = selectEngine(engine, coeffs, radius, oversample, kernel,
+                             spacing)
+    points[j:j + tileSize, i:i + tileSize] = integrate(
+        x[i:i + tileSize], y[j:j + tileSize], tx, ty, w, coeffs, memoryBudget)
+
+
+# State of a parallelEnergyMap() worker process, set by initialiseWorker()
+workerState = {}
+
+
+def initialiseWorker(shmName, shape, *args):
+    """Attach a worker process to the shared image."""
+    shm = shared_memory.SharedMemory(name=shmName)
+    workerState["shm"] = shm
+    workerState["points"] = np.ndarray(shape, buffer=shm.buf)
+    workerState["args"] = args
+
+
+def workerTile(tile):
+    """Integrate one tile of the shared image in a worker process."""
+    integrateTile(workerState["points"], tile, *workerState["args"])
+
+
+if __name__ == "__main__":
+    # Only needed to show the map, so batch jobs don't have to load it
+    import matplotlib.pyplot as plt
+
+    # Define constants to use
+    numPoints = 201  # The image will be of size numPoints x numPoints
+    dt = 0.001       # The step size to use in the numerical integration
+    sigma2X = 0.005  # The spot-size in the x-direction of the laser
+    sigma2Y = 0.005  # The spot-size in the y-direction of the laser
+
+    # Initialise the arrays for values of x, y and t
+    x = np.linspace(-1, 1, numPoints)
+    y = np.linspace(-1, 1, numPoints)
+    t = np.arange(0, 2 * np.pi, dt)
+
+    # Calculate the Lissajous figure
+    tx = np.sin(t)
+    ty = np.sin(t + np.pi / 2)
+    # (tx and ty should have the same dimensions as t)
+
+    # Run the numerical integration to find the energy distribution
+    # The power distribution is calculated at every point (x,y) and
+    # integrated with respect to t to find the energy transferred there
+    points = energyMap(x, y, tx, ty, dt, sigma2X, sigma2Y)
+
+    # Plot the resulting energy distribution
+    fig, ax = plt.subplots()
+    ax.imshow(points, interpolation="bilinear", origin="lower")  # Plot
+    ax.set_axis_off()
+    plt.show()
@@ -0,0 +1,221 @@
+"""
+Find the energy distributions for a sweep of Lissajous scanner settings.
+
+Each set of parameters (xFreq, yFreq, delta, sigma2X, sigma2Y) gives one
+energy map, found with gaussPow.adaptiveEnergyMap(). The maps are written
+as they are finished into a stack of shape (number of sets, numPoints,
+numPoints) in maps.npy, and the parameters of the stack are listed in
+index.json. Running the same sweep again only computes the maps which
+were not finished, so an interrupted sweep can be resumed.
+
+Usage
+-----
+python gaussSweep.py sweepDir --x-freq 1 2 3 --y-freq 1 2 --delta 0 1.57
+python gaussSweep.py sweepDir --parameters settings.csv --workers 8
+
+Functions
+---------
+parameterGrid(xFreq, yFreq, delta, sigma2X, sigma2Y): Every combination of
+    the given parameter values
+readParameters(filename): Read a list of parameter sets from a JSON or CSV
+    file
+runSweep(parameterSets, directory, ...): Compute the energy maps for all
+    the parameter sets
+loadSweep(directory): Open the stack of maps and the index of a sweep
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import gaussPow
+
+
+# The parameters of the Lissajous figure and laser spot for each map
+PARAMETER_NAMES = ("xFreq", "yFreq", "delta", "sigma2X", "sigma2Y")
+
+
+def parameterGrid(xFreq=(1,), yFreq=(1,), delta=(np.pi / 2,),
+                  sigma2X=(0.005,), sigma2Y=(0.005,)):
+    """Return a list of parameter sets for every combination of values."""
+    return [dict(zip(PARAMETER_NAMES, values))
+            for values in itertools.product(xFreq, yFreq, delta,
+                                            sigma2X, sigma2Y)]
+
+
+def readParameters(filename):
+    """
+    Read a list of parameter sets from a JSON or CSV file.
+
+    A JSON file holds a list of objects; a CSV file has a header row with
+    the parameter names. Parameters which are left out take the defaults
+    of parameterGrid().
+    """
+    with open(filename, newline="") as f:
+        if filename.endswith(".json"):
+            rows = json.load(f)
+        else:
+            rows = list(csv.DictReader(f))
+
+    defaults = parameterGrid()[0]
+    return [{name: float(row.get(name, defaults[name]))
+             for name in PARAMETER_NAMES} for row in rows]
+
+
+def runSweep(parameterSets, directory, numPoints=201, extent=(-1, 1),
+             tolerance=1e-6, engine="auto", workers=None):
+    """
+    Compute the energy maps for a list of parameter sets.
+
+    The maps are written straight into directory/maps.npy by the worker
+    processes, and directory/index.json is updated as each map is
+    finished. If the directory already holds the same sweep, only the
+    unfinished maps are computed.
+
+    Parameters
+    ----------
+    parameterSets: List of dicts holding the parameters for each map
+    directory: Where to write the stack of maps and the index
+    numPoints: Each map will be of size numPoints x numPoints
+    extent: The lower and upper limits of x and y
+    tolerance: The target error for gaussPow.adaptiveEnergyMap()
+    engine: The engine for gaussPow.adaptiveEnergyMap() to use
+    workers: Number of worker processes; defaults to the number of CPUs
+
+    Returns
+    -------
+    index: The contents of index.json
+    """
+    os.makedirs(directory, exist_ok=True)
+    mapsFile = os.path.join(directory, "maps.npy")
+    settings = {"numPoints": int(numPoints),
+                "extent": [float(e) for e in extent],
+                "tolerance": float(tolerance),
+                "engine": engine,
+                "parameters": [{name: float(p[name])
+                                for name in PARAMETER_NAMES}
+                               for p in parameterSets]}
+
+    # Carry on from an earlier run of the same sweep, if there was one
+    index = readIndex(directory)
+    if index is not None and os.path.exists(mapsFile):
+        for key, value in settings.items():
+            if index[key] != value:
+                raise ValueError(directory + " holds a different sweep")
+    else:
+        index = dict(settings, done=[False] * len(parameterSets),
+                     error=[None] * len(parameterSets),
+                     numSamples=[None] * len(parameterSets))
+        shape = (len(parameterSets), numPoints, numPoints)
+        np.lib.format.open_memmap(mapsFile, mode="w+", shape=shape).flush()
+        writeIndex(directory, index)
+
+    todo = [k for k, done in enumerate(index["done"]) if not done]
+    if not todo:
+        return index
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=min(workers, len(todo)),
+                             initializer=initialiseWorker,
+                             initargs=(mapsFile, settings)) as pool:
+        futures = [pool.submit(workerMap, k) for k in todo]
+
+        # Record each map as soon as it has been written
+        for future in as_completed(futures):
+            k, error, numSamples = future.result()
+            index["done"][k] = True
+            index["error"][k] = error
+            index["numSamples"][k] = numSamples
+            writeIndex(directory, index)
+
+    return index
+
+
+def loadSweep(directory):
+    """Return the stack of maps (memory-mapped, read-only) and the index."""
+    maps = np.load(os.path.join(directory, "maps.npy"), mmap_mode="r")
+    return maps, readIndex(directory)
+
+
+def readIndex(directory):
+    """Return the contents of directory/index.json, or None."""
+    try:
+        with open(os.path.join(directory, "index.json")) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def writeIndex(directory, index):
+    """Write directory/index.json so it is never left half written."""
+    filename = os.path.join(directory, "index.json")
+    with open(filename + ".tmp", "w") as f:
+        json.dump(index, f, indent=1)
+    os.replace(filename + ".tmp", filename)
+
+
+# State of a runSweep() worker process, set by initialiseWorker()
+workerState = {}
+
+
+def initialiseWorker(mapsFile, settings):
+    """Open the stack of maps in a worker process."""
+    workerState["maps"] = np.load(mapsFile, mmap_mode="r+")
+    workerState["settings"] = settings
+
+
+def workerMap(k):
+    """Compute map k of the sweep and write it into the stack."""
+    settings = workerState["settings"]
+    parameters = settings["parameters"][k]
+    x = np.linspace(*settings["extent"], settings["numPoints"])
+
+    points, error, numSamples = gaussPow.adaptiveEnergyMap(
+        x, x, parameters["sigma2X"], parameters["sigma2Y"],
+        parameters["xFreq"], parameters["yFreq"], parameters["delta"],
+        tolerance=settings["tolerance"], engine=settings["engine"])
+
+    # Make sure the map is on disk before it is marked as done
+    maps = workerState["maps"]
+    maps[k] = points
+    maps.flush()
+    return k, float(error), int(numSamples)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compute energy maps for a sweep of scanner settings.")
+    parser.add_argument("directory",
+                        help="where to write maps.npy and index.json")
+    parser.add_argument("--parameters",
+                        help="JSON or CSV file listing the parameter sets; "
+                             "otherwise every combination of the values "
+                             "below is used")
+    parser.add_argument("--x-freq", type=float, nargs="+", default=[1])
+    parser.add_argument("--y-freq", type=float, nargs="+", default=[1])
+    parser.add_argument("--delta", type=float, nargs="+",
+                        default=[np.pi / 2])
+    parser.add_argument("--sigma2x", type=float, nargs="+", default=[0.005])
+    parser.add_argument("--sigma2y", type=float, nargs="+", default=[0.005])
+    parser.add_argument("--num-points", type=int, default=201)
+    parser.add_argument("--extent", type=float, nargs=2, default=[-1, 1])
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    parser.add_argument("--engine", default="auto")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.parameters:
+        parameterSets = readParameters(args.parameters)
+    else:
+        parameterSets = parameterGrid(args.x_freq, args.y_freq, args.delta,
+                                      args.sigma2x, args.sigma2y)
+
+    index = runSweep(parameterSets, args.directory, args.num_points,
+                     args.extent, args.tolerance, args.engine, args.workers)
+    print(sum(index["done"]), "of", len(index["done"]), "maps finished")
@@ -0,0 +1,455 @@
+"""
+Time the slow parts of the Lissajous programs, without a window.
+
+The benchmarks cover the energy integration of gaussPow.py, the sampling
+of a whole curve done by lissajousGUI.py each time the parameters
+change, the work done by lissajousGUI.py at each tick of the animation,
+the slider callbacks of lissajousPlot.py (drawn with Matplotlib's Agg
+backend), and the tabulated exponential which the energy maps can use in
+place of np.exp. None of them need wxPython, OpenGL or a display. The
+time taken to import each of the modules used by batch jobs is also
+measured, with python -X importtime, and checked against a budget.
+
+Each benchmark is called repeatedly, and the median, minimum and maximum
+time per call are written to a JSON file along with the versions of
+Python and NumPy used. Given the JSON file from an earlier run, any
+benchmark whose median time has grown by more than a threshold is
+reported as a regression, and the exit status is 1. The exit status is
+also 1 if a module takes longer to import than IMPORT_BUDGET, or imports
+wxPython, OpenGL or Matplotlib.
+
+Usage
+-----
+python lissajousBench.py --output baseline.json
+python lissajousBench.py --output new.json --baseline baseline.json
+python lissajousBench.py --quick --groups energy frozen --threshold 0.2
+python lissajousBench.py --groups imports
+
+Functions
+---------
+timeCall(function, repeat, minTime): Time a function, calling it often
+    enough to get a reliable time
+importTime(module, repeat): Time the import of a module in a new
+    interpreter
+energyBenchmarks(quick): The gaussPow energy integration
+frozenBenchmarks(quick): Sampling a whole curve
+animationBenchmarks(quick): One tick of the animation
+plotBenchmarks(quick): The slider callbacks of lissajousPlot.py
+kernelBenchmarks(quick): The tabulated exponential against np.exp
+runBenchmarks(groups, quick, repeat, minTime): Run groups of benchmarks
+overBudget(results): The imports which are too slow or load heavy modules
+compareResults(results, baseline, threshold): The benchmarks which have
+    become slower or faster
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import warnings
+
+import numpy as np
+
+import gaussPow
+import lissajousCore
+
+
+# The modules which batch jobs use, which must import quickly (within
+# IMPORT_BUDGET seconds) and without any of HEAVY_MODULES
+IMPORT_MODULES = ("lissajousCore", "lissajous", "gaussPow", "gaussSweep",
+                  "gaussCache", "lissajousRender")
+IMPORT_BUDGET = 0.25
+HEAVY_MODULES = ("wx", "OpenGL", "matplotlib")
+
+
+def timeCall(function, repeat=5, minTime=0.05):
+    """
+    Return statistics of the time taken by function(), in seconds.
+
+    The function is first called once to warm up, then in loops long
+    enough (at least minTime) for the timer to be accurate; the time per
+    call is taken from repeat such loops.
+    """
+    function()
+
+    # Find how many calls make a loop of at least minTime
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= minTime:
+            break
+        number *= 2
+
+    times = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        times.append((time.perf_counter() - start) / number)
+
+    return {"median": float(np.median(times)), "min": min(times),
+            "max": max(times), "number": number, "repeat": repeat}
+
+
+def importTime(module, repeat=5):
+    """
+    Return statistics of the time taken to import module, in seconds.
+
+    Each import is done in a new interpreter, so nothing is already loaded,
+    and timed with python -X importtime. The heavy modules it loaded, if
+    any, are listed too.
+    """
+    times = []
+    loaded = set()
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import " + module],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, check=True).stderr
+
+        # Each line reads "import time: self | cumulative | name", in
+        # microseconds, and the module itself comes last
+        for line in output.splitlines():
+            fields = line.split("|")
+            if len(fields) != 3 or not fields[1].strip().isdigit():
+                continue
+            name = fields[2].strip()
+            loaded.add(name.split(".")[0])
+            if name == module:
+                times.append(int(fields[1]) / 1e6)
+
+    return {"median": float(np.median(times)), "min": min(times),
+            "max": max(times), "number": 1, "repeat": repeat,
+            "budget": IMPORT_BUDGET,
+            "heavyModules": sorted(loaded.intersection(HEAVY_MODULES))}
+
+
+def energyBenchmarks(quick=False):
+    """
+    Return the benchmarks of the energy integration.
+
+    gaussPow.energyMap() is timed for each combination of grid size, time
+    step and spot width, with the engine chosen automatically.
+    gaussPow.windowedEnergyMaps() is timed up to t = 20 pi in windows of
+    50 steps, with a step which fits the cycles of the figure (so the
+    factors are looked up) and with one which doesn't.
+    """
+    numPoints = (51, 101) if quick else (51, 101, 201)
+    timesteps = (0.01,) if quick else (0.01, 0.001)
+    spotWidths = (0.005,) if quick else (0.001, 0.005, 0.02)
+
+    benchmarks = []
+    for n, dt, sigma2 in itertools.product(numPoints, timesteps, spotWidths):
+        x = np.linspace(-1, 1, n)
+        t = np.arange(0, 2 * np.pi, dt)
+        tx, ty = gaussPow.lissajousFigure(t, 1, 1, np.pi / 2)
+        benchmarks.append((
+            "energyMap",
+            {"numPoints": n, "dt": dt, "sigma2": sigma2},
+            lambda x=x, tx=tx, ty=ty, dt=dt, sigma2=sigma2:
+                gaussPow.energyMap(x, x, tx, ty, dt, sigma2, sigma2)))
+
+    def windows(x, dt):
+        for _ in gaussPow.windowedEnergyMaps(x, x, 0.005, 0.005, 3, 2,
+                                             np.pi / 4, dt=dt,
+                                             window=50 * dt,
+                                             duration=20 * np.pi):
+            pass
+
+    for n in numPoints:
+        x = np.linspace(-1, 1, n)
+        for dt in (gaussPow.commensurateStep(3, 2, 0.001), 0.001):
+            benchmarks.append((
+                "windowedEnergyMaps",
+                {"numPoints": n, "dt": dt},
+                lambda x=x, dt=dt: windows(x, dt)))
+    return benchmarks
+
+
+def frozenBenchmarks(quick=False):
+    """
+    Return the benchmarks of sampling a whole curve.
+
+    lissajousCore.frozenCurve() is what lissajousGUI.py runs each time the
+    parameters change when not animating, on its 600 x 600 canvas.
+    """
+    frequencies = ((1, 1), (30, 29)) if quick else (
+        (1, 1), (3, 2), (30, 29), (1.7, np.pi))
+    size = 600
+    scale = 0.75
+
+    benchmarks = []
+    for xFreq, yFreq in frequencies:
+        lissajous = lissajousCore.Lissajous(xFreq, yFreq, np.pi / 4)
+        benchmarks.append((
+            "frozenCurve",
+            {"xFreq": xFreq, "yFreq": yFreq, "size": size},
+            lambda lissajous=lissajous: lissajousCore.frozenCurve(
+                lissajous, size * scale, size * scale,
+                origin=(-size, -size))))
+    return benchmarks
+
+
+def animationBenchmarks(quick=False):
+    """
+    Return the benchmarks of one tick of the animation.
+
+    Each tick the clock is consulted, the new points are added to the trail
+    and the changes and spans of the trail are found, as in onTimer() and
+    onPaint(). onInitialTimer() does the same with a trail which isn't yet
+    full; here the trail is emptied first. The onTimer() ticks are also
+    timed with the heat map shown, adding each point to a HeatMap and
+    taking the part which has changed.
+    """
+    lissajous = lissajousCore.Lissajous(3, 2, np.pi / 4)
+    timestep = 2 * np.pi / 1000
+    refreshRate = 60
+    samplesPerTick = (1, 100) if quick else (1, 2, 100)
+
+    def tick(trail, clock, state, numSamples, bEmpty, heatMap):
+        if bEmpty:
+            trail.clear()
+
+        # Pretend exactly one frame has passed since the last tick
+        state["now"] += 1 / refreshRate
+        clock.advance(state["now"])
+        state["t"] = lissajousCore.advanceTrail(trail, lissajous, state["t"],
+                                                numSamples, timestep,
+                                                450, 450, heatMap)
+        trail.takeChanges()
+        trail.spans()
+        if heatMap is not None:
+            heatMap.takeChanges()
+
+    benchmarks = []
+    for name, bEmpty, bHeatMap in (("onTimer", False, False),
+                                   ("onInitialTimer", True, False),
+                                   ("onTimerHeatMap", False, True)):
+        for numSamples in samplesPerTick:
+            heatMap = None
+            if bHeatMap:
+                # As shown on a 600 x 600 canvas
+                heatMap = lissajousCore.HeatMap(256, 256, 4 / 3, 4 / 3,
+                                                0.005, 0.005)
+            trail = lissajousCore.Trail(1000)
+            clock = lissajousCore.AnimationClock(numSamples * refreshRate,
+                                                 refreshRate)
+            clock.start(0)
+            state = {"now": 0, "t": 0}
+            if not bEmpty:
+                state["t"] = lissajousCore.advanceTrail(
+                    trail, lissajous, 0, trail.length, timestep)
+            args = (trail, clock, state, numSamples, bEmpty, heatMap)
+            benchmarks.append((name, {"samplesPerTick": numSamples},
+                               lambda args=args: tick(*args)))
+    return benchmarks
+
+
+def plotBenchmarks(quick=False):
+    """
+    Return the benchmarks of the slider callbacks of lissajousPlot.py.
+
+    Each call moves a slider, which calls update() or updateT() and
+    redraws the figure with the Agg backend.
+    """
+    import matplotlib
+    matplotlib.use("Agg")
+
+    # The script shows its figure when imported; Agg just warns
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        import lissajousPlot
+
+    def moveSlider(slider, values, state):
+        state["k"] = (state["k"] + 1) % len(values)
+        slider.set_val(values[state["k"]])
+
+    xValues = (1, 2, 3.5, 7)
+    numValues = (1, 2.5) if quick else (1, 2.5, 10)
+    return [("update", {"slider": "OmegaX"},
+             lambda state={"k": 0}: moveSlider(lissajousPlot.sOmegaX,
+                                               xValues, state)),
+            ("updateT", {"slider": "Number of cycles"},
+             lambda state={"k": 0}: moveSlider(lissajousPlot.sNum,
+                                               numValues, state))]
+
+
+def kernelBenchmarks(quick=False):
+    """
+    Return the benchmarks of the exponential kernels of the energy maps.
+
+    gaussPow.ExpTable, with linear and cubic interpolation and several
+    table sizes, is timed against np.exp on a million exponents spread
+    over those of a spot truncated at four standard deviations. The
+    largest error of each table is recorded with it. The direct engine,
+    whose time is mostly spent on exponentials, is timed with each kernel.
+    """
+    u = np.linspace(-8, 0, 2**20)
+    out = np.empty_like(u)
+    sizes = (1024, 16384) if quick else (64, 1024, 16384, 262144)
+
+    benchmarks = [("exp", {"kernel": "np.exp"},
+                   lambda: np.exp(u, out=out))]
+    for order, size in itertools.product((1, 3), sizes):
+        table = gaussPow.ExpTable(order=order, size=size)
+        benchmarks.append((
+            "exp", {"kernel": "ExpTable", "order": order, "size": size,
+                    "maxError": table.maxError},
+            lambda table=table: table(u, out=out)))
+
+    x = np.linspace(-1, 1, 101)
+    t = np.arange(0, 2 * np.pi, 0.01)
+    tx, ty = gaussPow.lissajousFigure(t, 3, 2, np.pi / 4)
+    kernels = [("np.exp", {}, np.exp)]
+    for order in (1, 3):
+        table = gaussPow.ExpTable(1e-6, order)
+        kernels.append(("ExpTable", {"order": order, "tolerance": 1e-6},
+                        table))
+    for name, parameters, kernel in kernels:
+        benchmarks.append((
+            "energyMap", dict(engine="direct", kernel=name, **parameters),
+            lambda kernel=kernel: gaussPow.energyMap(
+                x, x, tx, ty, 0.01, 0.005, 0.005, engine="direct",
+                kernel=kernel)))
+    return benchmarks
+
+
+# The groups of benchmarks, by name; the imports are timed by importTime()
+GROUPS = {"energy": energyBenchmarks,
+          "frozen": frozenBenchmarks,
+          "animation": animationBenchmarks,
+          "plot": plotBenchmarks,
+          "kernel": kernelBenchmarks,
+          "imports": None}
+
+
+def runBenchmarks(groups=tuple(GROUPS), quick=False, repeat=5, minTime=0.05):
+    """
+    Run groups of benchmarks and return the results.
+
+    Returns
+    -------
+    results: dict holding the environment the benchmarks were run in, and
+             a list with the group, name, parameters and times of each
+             benchmark
+    """
+    results = {"environment": {"python": platform.python_version(),
+                               "numpy": np.__version__,
+                               "platform": platform.platform(),
+                               "cpuCount": os.cpu_count(),
+                               "quick": quick},
+               "benchmarks": []}
+
+    for group in groups:
+        if group == "imports":
+            for module in IMPORT_MODULES:
+                results["benchmarks"].append(dict(
+                    group=group, name="import", parameters={"module": module},
+                    **importTime(module, repeat)))
+            continue
+
+        for name, parameters, function in GROUPS[group](quick):
+            timing = timeCall(function, repeat, minTime)
+            results["benchmarks"].append(dict(group=group, name=name,
+                                              parameters=parameters,
+                                              **timing))
+    return results
+
+
+def benchmarkKey(benchmark):
+    """Return what identifies a benchmark between runs."""
+    return (benchmark["group"], benchmark["name"],
+            json.dumps(benchmark["parameters"], sort_keys=True))
+
+
+def overBudget(results):
+    """Return the imports which are too slow or load heavy modules."""
+    return [b for b in results["benchmarks"] if "budget" in b and
+            (b["median"] > b["budget"] or b["heavyModules"])]
+
+
+def compareResults(results, baseline, threshold=0.1):
+    """
+    Compare the median times of results with those of a baseline.
+
+    Returns
+    -------
+    changes: List of (benchmark, ratio of new to old median time, status)
+             for every benchmark in both, where status is "slower" if the
+             time has grown by more than threshold, "faster" if it has
+             shrunk by as much, and "same" otherwise
+    """
+    old = {benchmarkKey(b): b for b in baseline["benchmarks"]}
+    changes = []
+    for benchmark in results["benchmarks"]:
+        key = benchmarkKey(benchmark)
+        if key not in old:
+            continue
+
+        ratio = benchmark["median"] / old[key]["median"]
+        if ratio > 1 + threshold:
+            status = "slower"
+        elif ratio < 1 / (1 + threshold):
+            status = "faster"
+        else:
+            status = "same"
+        changes.append((benchmark, ratio, status))
+    return changes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Time the slow parts of the Lissajous programs.")
+    parser.add_argument("--output", help="JSON file to write the results to")
+    parser.add_argument("--baseline",
+                        help="JSON file from an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="fraction by which a benchmark may slow down "
+                             "before it counts as a regression")
+    parser.add_argument("--groups", nargs="+", choices=tuple(GROUPS),
+                        default=list(GROUPS))
+    parser.add_argument("--quick", action="store_true",
+                        help="run fewer, smaller benchmarks")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05)
+    args = parser.parse_args()
+
+    results = runBenchmarks(args.groups, args.quick, args.repeat,
+                            args.min_time)
+    for b in results["benchmarks"]:
+        print("{:10} {:15} {:45} {:10.3f} ms".format(
+            b["group"], b["name"], json.dumps(b["parameters"]),
+            1000 * b["median"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=1)
+
+    bFailed = False
+    for b in overBudget(results):
+        heavy = ", ".join(b["heavyModules"]) or "no heavy modules"
+        print("over budget: {} takes {:.3f} s to import (budget {} s), "
+              "loads {}".format(b["parameters"]["module"], b["median"],
+                                b["budget"], heavy))
+        bFailed = True
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changes = compareResults(results, baseline, args.threshold)
+        for b, ratio, status in changes:
+            if status != "same":
+                print("{}: {} {} {} x{:.2f}".format(
+                    status, b["group"], b["name"],
+                    json.dumps(b["parameters"]), ratio))
+        bFailed |= any(status == "slower" for _, _, status in changes)
+
+    if bFailed:
+        sys.exit(1)
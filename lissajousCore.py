@@ -0,0 +1,538 @@
+"""
+The maths behind the Lissajous curve sketcher, without the GUI.
+
+Everything needed to compute and sample Lissajous curves is kept here, so
+it can be used (and timed) without wxPython or OpenGL; lissajousGUI.py
+draws the results. The energy integration of gaussPow.py, which also only needs
+NumPy, can be imported from here as well, so that batch jobs need nothing
+else: fundamentalPeriod, lissajousFigure, trapeziumWeights, energyMap,
+adaptiveEnergyMap, parallelEnergyMap, outOfCoreEnergyMap,
+windowedEnergyMaps, commensurateStep and ExpTable.
+
+Only NumPy (and the standard library) may be imported here, so that the
+module loads quickly; lissajousBench.py checks this, and the import time.
+
+Classes
+-------
+Lissajous: Handles the Lissajous operations
+Trail: Holds the most recent points of the animated curve
+AnimationClock: Works out how far the animation should have advanced
+HeatMap: Adds up the energy deposited by the beam during the animation
+
+Functions
+---------
+decimatePoints(points, cellSize, origin): Drop the vertices of a curve
+    which make no difference to the picture
+frozenCurve(lissajous, xScale, yScale, origin, ...): The points to draw for
+    the whole curve
+advanceTrail(trail, lissajous, t, n, timestep, xScale, yScale, heatMap):
+    Add the next n points of the curve to a trail
+"""
+
+import time
+
+import numpy as np
+
+from gaussPow import (fundamentalPeriod, lissajousFigure, trapeziumWeights,
+                      spotCoefficients, footprintSize, addFootprints,
+                      energyMap, adaptiveEnergyMap, parallelEnergyMap,
+                      outOfCoreEnergyMap, windowedEnergyMaps,
+                      commensurateStep, ExpTable)
+
+
+class Lissajous():
+    """
+    Handle the Lissajous variables and operations.
+
+    Parameters
+    ----------
+    xFreq_: Sets the initial x angular frequency
+    yFreq_: Sets the initial y angular frequency
+    phaseShift: Sets the initial phase shift
+
+    Variables
+    ---------
+    x: x value after the latest Lissajous update given by
+       sin(xFreq * t)
+    y: y value after the latest Lissajous update given by
+       sin(yFreq * t + delta)
+    xFreq: The x angular frequency
+    yFreq: The y angular frequency
+    delta: The phase shift, in radians
+
+    Methods
+    -------
+    updateLissajous(dt): Perform an update for the x and y values of the
+                       Lissajous curve at the given value of dt
+    sample(t, out, xScale, yScale): Calculate the points of the Lissajous
+                                    curve for an array of values of t
+    adaptiveTimes(xScale, yScale, tolerance, maxCycles): The values of t at
+        which to sample the curve so that it is drawn to within tolerance
+    """
+
+    def __init__(self, xFreq_, yFreq_, phaseShift):
+        """Initialise the class."""
+        self.x = 0
+        self.y = 0
+        self.xFreq = xFreq_
+        self.yFreq = yFreq_
+        self.delta = phaseShift
+
+    def updateLissajous(self, dt):
+        """Update x and y values of the Lissajous curve at the given dt."""
+        self.x = np.sin(self.xFreq * dt)
+        self.y = np.sin(self.yFreq * dt + self.delta)
+
+    def sample(self, t, out=None, xScale=1, yScale=1):
+        """
+        Calculate the points of the Lissajous curve for an array of t.
+
+        The x and y coordinates are multiplied by xScale and yScale and
+        written into the columns of out, an array of shape (len(t), 2),
+        which is created if not given. No other arrays are created, so
+        this is cheap enough to call every time the curve changes.
+        """
+        if out is None:
+            out = np.empty((len(t), 2))
+        x = out[:, 0]
+        y = out[:, 1]
+
+        np.multiply(t, self.xFreq, out=x)
+        np.sin(x, out=x)
+        x *= xScale
+
+        np.multiply(t, self.yFreq, out=y)
+        y += self.delta
+        np.sin(y, out=y)
+        y *= yScale
+        return out
+
+    def adaptiveTimes(self, xScale=1, yScale=1, tolerance=0.5, maxCycles=10,
+                      cellsPerCycle=32):
+        """
+        Return the values of t at which to sample the curve.
+
+        Straight lines between the points are within tolerance of the
+        curve, measured after scaling by xScale and yScale. Over a step h
+        the lines stray by up to h^2 |p''| / 8, where p'' is the second
+        derivative of the curve, so the points are spread out in t with a
+        density of sqrt(|p''| / (8 * tolerance)): close together where the
+        curve bends sharply and far apart where it is nearly straight.
+
+        The curve is sampled over one period if it closes (the last point
+        is then the same as the first), so no part of it is drawn twice;
+        otherwise it is sampled over maxCycles cycles of 2 * pi.
+        """
+        tEnd = fundamentalPeriod(self.xFreq, self.yFreq)
+        if tEnd is None or tEnd > 2 * np.pi * maxCycles:
+            tEnd = 2 * np.pi * maxCycles
+
+        # Find the size of p'' on a grid fine enough to follow it,
+        # taking the largest value at the ends of each cell
+        fastest = max(abs(self.xFreq), abs(self.yFreq), 1)
+        numCells = int(np.ceil(tEnd * fastest / (2 * np.pi) * cellsPerCycle))
+        t = np.linspace(0, tEnd, numCells + 1)
+        accel = np.hypot(xScale * self.xFreq ** 2 * np.sin(self.xFreq * t),
+                         yScale * self.yFreq ** 2 *
+                         np.sin(self.yFreq * t + self.delta))
+        accel = np.maximum(accel[:-1], accel[1:])
+
+        # Place one point per unit of the cumulative density
+        count = np.zeros(numCells + 1)
+        np.cumsum(np.sqrt(accel / (8 * tolerance)) * np.diff(t),
+                  out=count[1:])
+        numSteps = max(int(np.ceil(count[-1])), 1)
+        return np.interp(np.linspace(0, count[-1], numSteps + 1), count, t)
+
+
+class Trail():
+    """
+    Hold the most recent points of the animated curve in a ring buffer.
+
+    New points overwrite the oldest ones, so adding a point takes the same
+    time however long the trail is. Once the buffer has wrapped round, the
+    trail is drawn as two spans: from the oldest point to the end of the
+    buffer, then from the start of the buffer to the newest point.
+
+    Parameters
+    ----------
+    length: The number of points in the trail
+
+    Variables
+    ---------
+    length: The number of points in the trail
+    points: Numpy array holding the coordinates of the points; the extra
+            last row is a copy of the first, so that the two spans join up
+    colours: Numpy array holding the colours of the trail, from the oldest
+             point (black) to the newest (white)
+    head: Index of the row the next point will be written to
+    count: The number of points in the trail so far
+    changed: List of [start, stop) ranges of rows of points which have
+             changed since they were last taken by takeChanges()
+
+    Methods
+    -------
+    clear(self): Empty the trail
+    append(self, newPoints): Add an array of points to the trail
+    spans(self): The spans of the ring buffer to draw
+    takeChanges(self): The ranges of rows changed since the last call
+    """
+
+    def __init__(self, length):
+        """Initialise the class."""
+        self.length = length
+        self.points = np.zeros((length + 1, 2), dtype=np.float32)
+        self.colours = np.linspace((0, 0, 0), (1, 1, 1), length,
+                                   dtype=np.float32)
+        self.head = 0
+        self.count = 0
+        self.changed = []
+
+    def clear(self):
+        """Empty the trail."""
+        self.head = 0
+        self.count = 0
+        self.changed = []
+
+    def append(self, newPoints):
+        """Add an array of points, oldest first, to the trail."""
+        # Only the most recent length points will be kept
+        newPoints = newPoints[-self.length:]
+        n = len(newPoints)
+
+        # Write as many as fit before the end of the buffer,
+        # then wrap round to the start
+        first = min(n, self.length - self.head)
+        self.points[self.head:self.head + first] = newPoints[:first]
+        self.points[:n - first] = newPoints[first:]
+        self.markChanged(self.head, self.head + first)
+        self.markChanged(0, n - first)
+
+        # Keep the copy of the first row up to date
+        if n and (self.head == 0 or n > first):
+            self.points[self.length] = self.points[0]
+            self.markChanged(self.length, self.length + 1)
+
+        self.head = (self.head + n) % self.length
+        self.count = min(self.count + n, self.length)
+
+    def markChanged(self, start, stop):
+        """Add the rows from start up to stop to the changed ranges."""
+        if start >= stop:
+            return
+        if self.changed and self.changed[-1][1] == start:
+            self.changed[-1][1] = stop
+        else:
+            self.changed.append([start, stop])
+
+    def takeChanges(self):
+        """Return the ranges of rows changed since the last call."""
+        changed = self.changed
+        self.changed = []
+        return changed
+
+    def spans(self):
+        """
+        Return the spans of the ring buffer to draw, oldest first.
+
+        Each span is given as (first row of points, number of points,
+        first row of colours). The newest point is always drawn in white.
+        """
+        if self.count < self.length or self.head == 0:
+            # The points are in order from the start of the buffer
+            return [(0, self.count, self.length - self.count)]
+
+        # The first span ends with the copy of the first row
+        numOldest = self.length - self.head + 1
+        return [(self.head, numOldest, 0),
+                (0, self.head, numOldest - 1)]
+
+
+class AnimationClock():
+    """
+    Work out how far the animation should have advanced from the time.
+
+    The animation moves along the curve at a fixed number of samples per
+    second of real time, however often frames are actually drawn. If a
+    frame is late, the next one simply adds more samples.
+
+    Parameters
+    ----------
+    samplesPerSecond: How many points of the curve to add per second
+    refreshRate: The most frames to draw per second
+
+    Variables
+    ---------
+    samplesPerSecond: How many points of the curve to add per second
+    refreshRate: The most frames to draw per second
+    startTime: The time at which the animation started (or restarted)
+    lastFrameTime: The time at which the last frame was drawn
+    samplesDone: The number of points added since startTime
+    frames: The number of frames drawn since startTime
+    droppedFrames: The number of frames missed since startTime
+
+    Methods
+    -------
+    start(self, now): Restart the clock
+    setSamplesPerSecond(self, samplesPerSecond, now): Change the speed
+    due(self, now): Whether it is time to draw a new frame
+    advance(self, now): Start a new frame; return the number of new points
+    """
+
+    def __init__(self, samplesPerSecond, refreshRate=60):
+        """Initialise the class."""
+        self.samplesPerSecond = samplesPerSecond
+        self.refreshRate = refreshRate
+        self.start()
+
+    def start(self, now=None):
+        """Restart the clock; now defaults to time.perf_counter()."""
+        if now is None:
+            now = time.perf_counter()
+        self.startTime = now
+        self.lastFrameTime = now
+        self.samplesDone = 0
+        self.frames = 0
+        self.droppedFrames = 0
+
+    def setSamplesPerSecond(self, samplesPerSecond, now=None):
+        """Change the speed without jumping forwards or backwards."""
+        if now is None:
+            now = time.perf_counter()
+        self.advance(now)
+        self.samplesPerSecond = samplesPerSecond
+        self.startTime = now - self.samplesDone / samplesPerSecond
+
+    def due(self, now=None):
+        """Return whether it is time to draw a new frame."""
+        if now is None:
+            now = time.perf_counter()
+        return (now - self.lastFrameTime) * self.refreshRate >= 1
+
+    def advance(self, now=None):
+        """Start a new frame and return the number of points to add."""
+        if now is None:
+            now = time.perf_counter()
+
+        # Count the frames which should have been drawn since the last one
+        missed = int((now - self.lastFrameTime) * self.refreshRate) - 1
+        if missed > 0:
+            self.droppedFrames += missed
+        self.frames += 1
+        self.lastFrameTime = now
+
+        # Work out where the animation should be by now
+        target = int((now - self.startTime) * self.samplesPerSecond)
+        numSamples = target - self.samplesDone
+        self.samplesDone = target
+        return numSamples
+
+
+class HeatMap():
+    """
+    Add up the energy deposited by the beam as the animation goes along.
+
+    Each new point of the animation adds the footprint of the laser spot
+    (see gaussPow.addFootprints()) to a running total held on a grid, so
+    the cost of each point depends on the size of the spot rather than on
+    the size of the grid. The rows and columns touched since they were
+    last taken are kept, so that only they need drawing again.
+
+    Parameters
+    ----------
+    width: The number of columns of the grid
+    height: The number of rows of the grid
+    xExtent: The grid covers x from -xExtent to xExtent
+    yExtent: The grid covers y from -yExtent to yExtent
+    sigma2X: The spot-size in the x-direction of the laser
+    sigma2Y: The spot-size in the y-direction of the laser
+    radius: Number of standard deviations at which the spot is truncated
+
+    Variables
+    ---------
+    energy: Numpy array of shape (height, width) holding the energy
+            deposited so far; row j, column i is the cell centred at
+            (x[i], y[j])
+    x: The x coordinates of the centres of the columns
+    y: The y coordinates of the centres of the rows
+    coeffs: The coefficients of the spot (see gaussPow.spotCoefficients())
+    kx: Half-width, in columns, of the footprint of the spot
+    ky: Half-height, in rows, of the footprint of the spot
+    peak: The largest energy in the grid
+    changed: [first row, last row + 1, first column, last column + 1] of
+             the part of the grid changed since it was last taken by
+             takeChanges(), or None
+
+    Methods
+    -------
+    clear(self): Set the energy back to zero
+    deposit(self, points, dt): Add the footprints of the spot at points,
+                               each shone for time dt
+    passEnergy(self, speed): The energy left by one pass of the beam
+    takeChanges(self): The part of the grid changed since the last call
+    """
+
+    def __init__(self, width, height, xExtent, yExtent, sigma2X, sigma2Y,
+                 radius=4):
+        """Initialise the class."""
+        self.energy = np.zeros((height, width))
+        self.x = (np.arange(width) + 0.5) * (2 * xExtent / width) - xExtent
+        self.y = (np.arange(height) + 0.5) * (2 * yExtent / height) - yExtent
+        self.coeffs = spotCoefficients(sigma2X, sigma2Y)
+        kx, ky = footprintSize(self.coeffs, self.x[1] - self.x[0],
+                               self.y[1] - self.y[0], radius)
+        self.kx = min(kx, width)
+        self.ky = min(ky, height)
+        self.clear()
+
+    def clear(self):
+        """Set the energy back to zero; the whole grid has changed."""
+        self.energy[:] = 0
+        self.peak = 0
+        self.changed = [0, self.energy.shape[0], 0, self.energy.shape[1]]
+
+    def deposit(self, points, dt):
+        """Add the footprints of the spot at an array of (x, y) points."""
+        if len(points) == 0:
+            return
+
+        x0, hx = self.x[0], self.x[1] - self.x[0]
+        y0, hy = self.y[0], self.y[1] - self.y[0]
+        tx = points[:, 0]
+        ty = points[:, 1]
+        addFootprints(self.energy, x0, hx, y0, hy, tx, ty,
+                      np.full(len(points), dt), self.coeffs, self.kx, self.ky)
+
+        # Work out the box of cells the footprints could have touched
+        # (addFootprints() moves a beam off the grid to its edge)
+        height, width = self.energy.shape
+        i = np.clip(np.rint((tx - x0) / hx), 0, width - 1)
+        j = np.clip(np.rint((ty - y0) / hy), 0, height - 1)
+        box = [max(int(j.min()) - self.ky, 0),
+               min(int(j.max()) + self.ky + 1, height),
+               max(int(i.min()) - self.kx, 0),
+               min(int(i.max()) + self.kx + 1, width)]
+        if box[0] >= box[1] or box[2] >= box[3]:
+            return
+
+        self.peak = max(self.peak,
+                        self.energy[box[0]:box[1], box[2]:box[3]].max())
+        if self.changed is None:
+            self.changed = box
+        else:
+            self.changed = [min(self.changed[0], box[0]),
+                            max(self.changed[1], box[1]),
+                            min(self.changed[2], box[2]),
+                            max(self.changed[3], box[3])]
+
+    def passEnergy(self, speed):
+        """
+        Return the energy left on its path by the beam passing at speed.
+
+        This is the integral of the spot over a straight line through its
+        centre, for a round spot of the same area; it gives an idea of the
+        energy to expect in the grid before the curve crosses itself.
+        """
+        a, b, c = self.coeffs
+        return np.sqrt(2 * np.pi / np.sqrt(a * c - b**2)) / speed
+
+    def takeChanges(self):
+        """
+        Return the part of the grid changed since the last call, or None.
+
+        The part is given as (first row, last row + 1, first column, last
+        column + 1).
+        """
+        changed = self.changed
+        self.changed = None
+        return None if changed is None else tuple(changed)
+
+
+def decimatePoints(points, cellSize=1, origin=(0, 0)):
+    """
+    Drop the vertices of a curve which make no difference to the picture.
+
+    The plane is split into square cells of side cellSize, starting from
+    origin. Where several vertices in a row fall in the same cell, only
+    the first and last are kept; the line between them stays inside the
+    cell, as did the vertices which were dropped. Cells of half a pixel
+    leave the drawn curve unchanged; whole pixels drop more vertices but
+    can move a few pixels of the line. Return the kept vertices.
+    """
+    points = np.asarray(points)
+    if len(points) < 3:
+        return points
+
+    cells = np.floor((points - origin) / cellSize)
+    sameCell = np.all(cells[1:] == cells[:-1], axis=1)
+
+    # Keep the ends, and any vertex not in the same cell as both neighbours
+    keep = np.ones(len(points), dtype=bool)
+    keep[1:-1] = ~(sameCell[:-1] & sameCell[1:])
+    return points[keep]
+
+
+def frozenCurve(lissajous, xScale, yScale, origin=(0, 0), pixelTolerance=0.25,
+                maxCycles=10, cellSize=0.5, chunkSize=2048, cancelled=None):
+    """
+    Return the points to draw for the whole curve, as in frozen mode.
+
+    The coordinates are those set up by glOrtho() in lissajousGUI.py, where
+    one pixel is two units across and the bottom left corner is at origin. The
+    values of t are chosen with Lissajous.adaptiveTimes() so that the lines
+    drawn stay within pixelTolerance pixels of the curve, and the points
+    which make no difference to the picture are then dropped with
+    decimatePoints(), using cells of cellSize pixels.
+
+    The points are computed chunkSize at a time, and if the threading.Event
+    cancelled is set in the meantime None is returned.
+
+    Returns
+    -------
+    curve: dict holding the values of t, the float32 points to draw,
+           numSampled (the number of points before decimation), and
+           sampleTime and decimationTime in seconds
+    """
+    sampleStart = time.perf_counter()
+    t = lissajous.adaptiveTimes(xScale, yScale,
+                                tolerance=2 * pixelTolerance,
+                                maxCycles=maxCycles)
+    points = np.empty((len(t), 2), dtype=np.float32)
+
+    # Work in chunks so a newer request isn't kept waiting
+    for start in range(0, len(t), chunkSize):
+        if cancelled is not None and cancelled.is_set():
+            return None
+        stop = start + chunkSize
+        lissajous.sample(t[start:stop], out=points[start:stop],
+                         xScale=xScale, yScale=yScale)
+
+    decimationStart = time.perf_counter()
+    drawn = decimatePoints(points, 2 * cellSize, origin)
+    return {"t": t, "points": drawn, "numSampled": len(points),
+            "sampleTime": decimationStart - sampleStart,
+            "decimationTime": time.perf_counter() - decimationStart}
+
+
+def advanceTrail(trail, lissajous, t, n, timestep, xScale=1, yScale=1,
+                 heatMap=None):
+    """
+    Add the next n points of the curve, after time t, to a trail.
+
+    The points are timestep apart. Only the most recent points fit in the
+    trail, so any which would be overwritten are not computed, unless a
+    HeatMap is given: the energy of every point is then added to it. Return
+    the time of the newest point.
+    """
+    if n <= 0:
+        return t
+
+    first = 1 if heatMap is not None else max(1, n - trail.length + 1)
+    times = t + np.arange(first, n + 1) * timestep
+    if heatMap is not None:
+        # The heat map is in the units of the curve, before scaling
+        heatMap.deposit(lissajous.sample(times), timestep)
+        times = times[-trail.length:]
+
+    trail.append(lissajous.sample(times, xScale=xScale, yScale=yScale))
+    return t + n * timestep
@@ -0,0 +1,350 @@
+"""
+OpenGL vertex buffers and textures for drawing Lissajous curves.
+
+The vertices and colours of a curve are kept in vertex buffer objects
+(VBOs) in the graphics card's memory, stored as 32-bit floats. When the
+curve changes only the vertices that have changed are sent to the graphics
+card, rather than the whole curve every frame. In the same way, only the
+part of an energy map which has changed is sent to its texture.
+
+Classes
+-------
+CurveBuffers: Holds the vertices and colours of a curve in VBOs
+HeatTexture: Holds an energy map in a texture
+
+Functions
+---------
+createHeadlessContext(width, height): Make a GL context without a window
+
+Running this module draws a curve without a window, using Mesa's software
+renderer, and reports the bytes uploaded each frame:
+
+    PYOPENGL_PLATFORM=egl EGL_PLATFORM=surfaceless python lissajousGL.py
+    PYOPENGL_PLATFORM=osmesa python lissajousGL.py
+"""
+
+import ctypes
+import os
+
+import numpy as np
+from OpenGL import GL
+
+
+class CurveBuffers():
+    """
+    Hold the vertices and colours of a curve in vertex buffer objects.
+
+    A GL context must be current when the class is created and used.
+
+    Parameters
+    ----------
+    capacity: The most vertices the buffers can hold
+    colours: Array of shape (capacity, 3) holding the RGB colour of each
+             vertex; uploaded once as the colours never change
+
+    Variables
+    ---------
+    capacity: The most vertices the buffers can hold
+    vertexBuffer: The name of the VBO holding the vertex coordinates
+    colourBuffer: The name of the VBO holding the vertex colours
+    uploadBytes: Number of bytes uploaded since the end of the last frame
+    frameBytes: Number of bytes uploaded during the last frame
+
+    Methods
+    -------
+    uploadPoints(self, points, start): Copy vertices into the buffer
+    draw(self, start, count, colourStart): Draw part of the curve
+    endFrame(self): Record the bytes uploaded during this frame
+    delete(self): Free the buffers
+    """
+
+    def __init__(self, capacity, colours):
+        """Create the buffers and upload the colours."""
+        self.capacity = capacity
+        self.uploadBytes = 0
+        self.frameBytes = 0
+
+        # Make room for the vertices, which will be filled in later
+        self.vertexBuffer = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vertexBuffer)
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, capacity * 2 * 4, None,
+                        GL.GL_DYNAMIC_DRAW)
+
+        # The colours are only uploaded once
+        colours = np.ascontiguousarray(colours, dtype=np.float32)
+        self.colourBuffer = GL.glGenBuffers(1)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.colourBuffer)
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, colours.nbytes, colours,
+                        GL.GL_STATIC_DRAW)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self.uploadBytes += colours.nbytes
+
+    def uploadPoints(self, points, start=0):
+        """Copy an array of vertices into the buffer, from vertex start."""
+        points = np.ascontiguousarray(points, dtype=np.float32)
+        if len(points) == 0:
+            return
+
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vertexBuffer)
+        GL.glBufferSubData(GL.GL_ARRAY_BUFFER, start * 2 * 4, points.nbytes,
+                           points)
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+        self.uploadBytes += points.nbytes
+
+    def draw(self, start, count, colourStart=None):
+        """
+        Draw count vertices from vertex start as a line strip.
+
+        The colours are taken from colourStart onwards, which defaults to
+        start. The vertex and colour arrays must be enabled.
+        """
+        if colourStart is None:
+            colourStart = start
+
+        # Point OpenGL at the buffers; the pointers are offsets into them
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vertexBuffer)
+        GL.glVertexPointer(2, GL.GL_FLOAT, 0, ctypes.c_void_p(start * 2 * 4))
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.colourBuffer)
+        GL.glColorPointer(3, GL.GL_FLOAT, 0,
+                          ctypes.c_void_p(colourStart * 3 * 4))
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+
+        GL.glDrawArrays(GL.GL_LINE_STRIP, 0, count)
+
+    def endFrame(self):
+        """Record and return the number of bytes uploaded this frame."""
+        self.frameBytes = self.uploadBytes
+        self.uploadBytes = 0
+        return self.frameBytes
+
+    def delete(self):
+        """Free the buffers."""
+        GL.glDeleteBuffers(2, [self.vertexBuffer, self.colourBuffer])
+
+
+class HeatTexture():
+    """
+    Hold an energy map in a texture, to be drawn behind the curve.
+
+    The energy is shown in shades of colour, from black for none to full
+    colour for scale or more. Only the part of the map which has changed is
+    sent to the graphics card. The scale is doubled whenever the peak of
+    the map goes above it, which means sending the whole map again, so the
+    whole map is only sent a few times however long the map is added to.
+
+    A GL context must be current when the class is created and used.
+
+    Parameters
+    ----------
+    width: The number of columns of the map
+    height: The number of rows of the map
+    scale: The energy to show in full colour to start with; defaults to
+           the first peak uploaded
+    colour: The RGB colour of the hottest parts of the map
+
+    Variables
+    ---------
+    width: The number of columns of the map
+    height: The number of rows of the map
+    colour: The RGB colour of the hottest parts of the map
+    scale: The energy shown in full colour, or None until the first upload
+    texture: The name of the texture holding the map
+    uploadBytes: Number of bytes uploaded since the end of the last frame
+    frameBytes: Number of bytes uploaded during the last frame
+
+    Methods
+    -------
+    uploadEnergy(self, energy, region, peak): Copy part of a map into the
+                                              texture
+    draw(self, xExtent, yExtent): Draw the map over a rectangle
+    endFrame(self): Record the bytes uploaded during this frame
+    delete(self): Free the texture
+    """
+
+    def __init__(self, width, height, scale=None, colour=(1.0, 0.45, 0.1)):
+        """Create the texture, filled with black."""
+        self.width = width
+        self.height = height
+        self.colour = colour
+        self.scale = scale
+        self.uploadBytes = 0
+        self.frameBytes = 0
+
+        self.texture = GL.glGenTextures(1)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER,
+                           GL.GL_LINEAR)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER,
+                           GL.GL_LINEAR)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S,
+                           GL.GL_CLAMP_TO_EDGE)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T,
+                           GL.GL_CLAMP_TO_EDGE)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_LUMINANCE, width, height,
+                        0, GL.GL_LUMINANCE, GL.GL_FLOAT,
+                        np.zeros((height, width), dtype=np.float32))
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+    def uploadEnergy(self, energy, region=None, peak=None):
+        """
+        Copy part of an energy map into the texture.
+
+        region is (first row, last row + 1, first column, last column + 1),
+        or None for the whole map; peak is the largest energy in the map,
+        used to decide the scale.
+        """
+        if peak is None:
+            peak = energy.max()
+        if region is None:
+            region = (0, self.height, 0, self.width)
+
+        if peak > 0:
+            if self.scale is None:
+                self.scale = peak
+            elif peak > self.scale:
+                # The colours of the whole map change with the scale
+                while peak > self.scale:
+                    self.scale *= 2
+                region = (0, self.height, 0, self.width)
+
+        top, bottom, left, right = region
+        if top >= bottom or left >= right:
+            return
+        pixels = energy[top:bottom, left:right].astype(np.float32)
+        if self.scale:
+            pixels *= 1 / self.scale
+        np.minimum(pixels, 1, out=pixels)
+
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+        GL.glTexSubImage2D(GL.GL_TEXTURE_2D, 0, left, top, right - left,
+                           bottom - top, GL.GL_LUMINANCE, GL.GL_FLOAT,
+                           pixels)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        self.uploadBytes += pixels.nbytes
+
+    def draw(self, xExtent, yExtent):
+        """Draw the map over the rectangle from -extent to extent."""
+        GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glTexEnvi(GL.GL_TEXTURE_ENV, GL.GL_TEXTURE_ENV_MODE,
+                     GL.GL_MODULATE)
+        GL.glColor3f(*self.colour)
+
+        # The first row of the map is at the bottom
+        GL.glBegin(GL.GL_QUADS)
+        for u, v in ((0, 0), (1, 0), (1, 1), (0, 1)):
+            GL.glTexCoord2f(u, v)
+            GL.glVertex2f((2 * u - 1) * xExtent, (2 * v - 1) * yExtent)
+        GL.glEnd()
+
+        GL.glDisable(GL.GL_TEXTURE_2D)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+    def endFrame(self):
+        """Record and return the number of bytes uploaded this frame."""
+        self.frameBytes = self.uploadBytes
+        self.uploadBytes = 0
+        return self.frameBytes
+
+    def delete(self):
+        """Free the texture."""
+        GL.glDeleteTextures([self.texture])
+
+
+def createHeadlessContext(width, height):
+    """Make a GL context current without a window, using Mesa."""
+    platform = os.environ.get("PYOPENGL_PLATFORM")
+
+    if platform == "osmesa":
+        from OpenGL import osmesa
+        context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0,
+                                                None)
+        buffer = (GL.GLubyte * (width * height * 4))()
+        osmesa.OSMesaMakeCurrent(context, buffer, GL.GL_UNSIGNED_BYTE,
+                                 width, height)
+        return context, buffer
+
+    elif platform == "egl":
+        from OpenGL import EGL
+        os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+        display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        EGL.eglInitialize(display, None, None)
+
+        attributes = [EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+                      EGL.EGL_RED_SIZE, 8, EGL.EGL_GREEN_SIZE, 8,
+                      EGL.EGL_BLUE_SIZE, 8,
+                      EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+                      EGL.EGL_NONE]
+        config = EGL.EGLConfig()
+        numConfigs = EGL.EGLint()
+        EGL.eglChooseConfig(display, (EGL.EGLint * 11)(*attributes),
+                            ctypes.pointer(config), 1,
+                            ctypes.pointer(numConfigs))
+        size = [EGL.EGL_WIDTH, width, EGL.EGL_HEIGHT, height, EGL.EGL_NONE]
+        surface = EGL.eglCreatePbufferSurface(display, config,
+                                              (EGL.EGLint * 5)(*size))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context = EGL.eglCreateContext(display, config, EGL.EGL_NO_CONTEXT,
+                                       None)
+        EGL.eglMakeCurrent(display, surface, surface, context)
+        return context, surface
+
+    raise RuntimeError("Set PYOPENGL_PLATFORM to egl or osmesa")
+
+
+if __name__ == "__main__":
+    width = height = 600
+    context = createHeadlessContext(width, height)
+    print(GL.glGetString(GL.GL_RENDERER).decode())
+
+    # Set up the canvas in the same way as the application
+    GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+    GL.glEnableClientState(GL.GL_COLOR_ARRAY)
+    GL.glClearColor(0.0, 0.0, 0.0, 0.0)
+    GL.glViewport(0, 0, width, height)
+    GL.glMatrixMode(GL.GL_PROJECTION)
+    GL.glLoadIdentity()
+    GL.glOrtho(-width, width, -height, height, 0, 1)
+
+    # Draw a whole curve, as when the animation is off
+    numPoints = 10001
+    t = np.linspace(0, 20 * np.pi, numPoints)
+    points = np.column_stack((np.sin(3 * t), np.sin(2 * t))) * 450
+    buffers = CurveBuffers(numPoints, np.ones((numPoints, 3)))
+    buffers.uploadPoints(points)
+    GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+    buffers.draw(0, numPoints)
+    GL.glFinish()
+    print("Frame 0: uploaded {} bytes".format(buffers.endFrame()))
+
+    pixels = GL.glReadPixels(0, 0, width, height, GL.GL_RGB,
+                             GL.GL_UNSIGNED_BYTE)
+    pixels = np.frombuffer(pixels, dtype=np.uint8)
+    print("Lit pixels:", np.count_nonzero(pixels.reshape(-1, 3).any(1)))
+
+    # Change one vertex per frame, as when animating
+    for frame in range(1, 6):
+        buffers.uploadPoints(points[frame - 1:frame] * 0.5, frame - 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        buffers.draw(0, numPoints)
+        GL.glFinish()
+        print("Frame {}: uploaded {} bytes".format(frame, buffers.endFrame()))
+
+    # Add one point per frame to an energy map, drawn behind the curve,
+    # as when animating with the heat map shown
+    from lissajousCore import HeatMap
+    heatMap = HeatMap(256, 256, width / 450, height / 450, 0.005, 0.005)
+    heat = HeatTexture(256, 256, heatMap.passEnergy(np.hypot(3, 2)))
+    for frame in range(6):
+        heatMap.deposit(points[frame:frame + 1] / 450, 2 * np.pi / 1000)
+        heat.uploadEnergy(heatMap.energy, heatMap.takeChanges(),
+                          heatMap.peak)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT)
+        heat.draw(width, height)
+        buffers.draw(0, numPoints)
+        GL.glFinish()
+        print("Heat map frame {}: uploaded {} bytes".format(
+            frame, heat.endFrame()))
+
+    buffers.delete()
+    heat.delete()
@@ -0,0 +1,1351 @@
+"""
+The GUI of the Lissajous curve sketcher.
+
+The windows and controls, built with wxPython, and the drawing of the
+curves with OpenGL. The curve maths is in lissajousCore.py, and the app is
+started by lissajous.py, which only imports this module when it is needed.
+
+Classes
+-------
+CurveWorker: Computes curves in a background thread
+Timings: Records how long each part of the application takes
+MyGLCanvas: Handles the drawing operations
+FrequencySlider: Implements the freq controls
+PhaseShiftSlider: Implements the phase shift controls
+AnimationControls: Implements the animation controls
+Control: Provides the user controls
+Gui: The main application window
+"""
+
+# Import all the required modules
+import collections
+import contextlib
+import csv
+import json
+import threading                # used to compute curves in the background
+import time                     # used to time the animation
+import wx                       # framework to build the GUI
+import wx.glcanvas as wxcanvas
+import wx.lib.newevent as wxevt
+import numpy as np              # used for its array object and maths funcitons
+from OpenGL import GL           # graphics library to draw out the curves
+
+from lissajousCore import Lissajous, Trail, AnimationClock, HeatMap
+from lissajousCore import frozenCurve, advanceTrail
+from lissajousGL import CurveBuffers, HeatTexture   # kept on the graphics card
+
+
+# Define new events to use in custom classes within the GUI
+FrequencySliderEvent, EVT_FSLIDER = wxevt.NewEvent()
+PhaseShiftSliderEvent, EVT_PSLIDER = wxevt.NewEvent()
+AnimationControlEvent, EVT_ACONTROL = wxevt.NewEvent()
+
+
+class CurveWorker():
+    """
+    Compute curves in a background thread, only ever for the latest request.
+
+    A request made while another is waiting replaces it, and the one being
+    computed is cancelled, so a fast drag of a slider only leads to the
+    final curve being computed.
+
+    Parameters
+    ----------
+    compute: Function called in the thread as compute(request, cancelled),
+             where cancelled is a threading.Event which is set once the
+             request has been replaced; it may then give up and return None
+
+    Variables
+    ---------
+    compute: The function used to compute each request
+    thread: The background thread
+    condition: Guards pending and the counters, and wakes the thread
+    pending: The (request, onDone, cancelled) waiting to be computed, or None
+    cancelled: The threading.Event of the latest request
+    bRunning: bool specifying whether the thread should keep running
+    numSubmitted: Number of requests made
+    numComputed: Number of requests computed in full
+    numCancelled: Number of requests replaced before they were finished
+
+    Methods
+    -------
+    submit(self, request, onDone): Compute request in the background and
+                                   call onDone(request, result) when done
+    stop(self): Stop the thread once it has finished its current request
+    run(self): The loop run by the thread
+    """
+
+    def __init__(self, compute):
+        """Initialise the class and start the thread."""
+        self.compute = compute
+        self.condition = threading.Condition()
+        self.pending = None
+        self.cancelled = threading.Event()
+        self.bRunning = True
+        self.numSubmitted = 0
+        self.numComputed = 0
+        self.numCancelled = 0
+
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, request, onDone):
+        """
+        Compute request in the background, replacing any earlier request.
+
+        onDone(request, result) is called in the worker thread, so it
+        should hand the result over to the GUI with wx.CallAfter().
+        """
+        with self.condition:
+            if self.pending is not None:
+                self.numCancelled += 1
+
+            # Tell the request being computed, if any, to give up
+            self.cancelled.set()
+            self.cancelled = threading.Event()
+            self.pending = (request, onDone, self.cancelled)
+            self.numSubmitted += 1
+            self.condition.notify()
+
+    def stop(self):
+        """Stop the thread once it has finished its current request."""
+        with self.condition:
+            self.bRunning = False
+            self.cancelled.set()
+            self.condition.notify()
+
+    def run(self):
+        """Compute the latest request whenever there is one."""
+        while True:
+            with self.condition:
+                while self.pending is None and self.bRunning:
+                    self.condition.wait()
+                if not self.bRunning:
+                    return
+                request, onDone, cancelled = self.pending
+                self.pending = None
+
+            result = self.compute(request, cancelled)
+            bDone = result is not None and not cancelled.is_set()
+            with self.condition:
+                if bDone:
+                    self.numComputed += 1
+                else:
+                    self.numCancelled += 1
+            if bDone:
+                onDone(request, result)
+
+
+class Timings():
+    """
+    Record how long each part of the application takes, when enabled.
+
+    Each phase is recorded as (name, start, duration), with times in
+    seconds from when recording started. Frames are only timed while the
+    curve is animating; the gap before the first frame after a pause is
+    not counted. Other values, such as the bytes uploaded for each frame,
+    are recorded as (name, time, value), and the counters of other
+    objects can be watched so that they are reported too. Recording is
+    off by default, and then costs almost nothing.
+
+    Parameters
+    ----------
+    bEnabled: bool specifying whether to record
+    maxRecords: The most phases to keep; the oldest are forgotten
+
+    Variables
+    ---------
+    bEnabled: bool specifying whether to record
+    records: deque holding (name, start, duration) for each phase
+    frameTimes: deque holding the time at which each frame was drawn
+    frameIntervals: deque holding the time between each frame and the one
+                    before it, while animating
+    lastFrameTime: The time of the last frame, or None if paused
+    droppedFrames: Number of frames missed at the display's refresh rate
+    values: deque holding (name, time, value) for each other value
+    watched: List of (owner, name) for each attribute to report
+    startTime: The time at which recording started
+
+    Methods
+    -------
+    phase(self, name): Context manager which records the time taken by the
+                       block it wraps
+    frame(self, refreshRate): Record that a frame has been drawn
+    pauseFrames(self): Stop timing frames until the next one is drawn
+    value(self, name, value): Record a value other than a time
+    watch(self, owner, *names): Report the named attributes of owner
+    counters(self): Dict of the current values of the watched attributes
+    summary(self): Dict of the statistics of each phase and of the frames
+    summaryText(self): A one line summary, for the status bar
+    save(self, filename): Save the records to a .json or .csv file
+    """
+
+    def __init__(self, bEnabled=False, maxRecords=100000):
+        """Initialise the class."""
+        self.bEnabled = bEnabled
+        self.records = collections.deque(maxlen=maxRecords)
+        self.frameTimes = collections.deque(maxlen=maxRecords)
+        self.frameIntervals = collections.deque(maxlen=maxRecords)
+        self.lastFrameTime = None
+        self.droppedFrames = 0
+        self.values = collections.deque(maxlen=maxRecords)
+        self.watched = []
+        self.startTime = time.perf_counter()
+
+    def phase(self, name):
+        """Return a context manager recording the time taken by a block."""
+        if not self.bEnabled:
+            return contextlib.nullcontext()
+        return self.timedPhase(name)
+
+    @contextlib.contextmanager
+    def timedPhase(self, name):
+        """Record the time taken by the block wrapped by the with statement."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((name, start - self.startTime,
+                                 time.perf_counter() - start))
+
+    def frame(self, refreshRate=60):
+        """Record that a frame has been drawn, counting any missed."""
+        if not self.bEnabled:
+            return
+        now = time.perf_counter() - self.startTime
+        if self.lastFrameTime is not None:
+            # Count missed frames the same way as AnimationClock.advance()
+            interval = now - self.lastFrameTime
+            missed = int(interval * refreshRate) - 1
+            if missed > 0:
+                self.droppedFrames += missed
+            self.frameIntervals.append(interval)
+        self.lastFrameTime = now
+        self.frameTimes.append(now)
+
+    def pauseFrames(self):
+        """Stop timing frames, e.g. when frozen, until the next is drawn."""
+        self.lastFrameTime = None
+
+    def value(self, name, value):
+        """Record a value, such as the number of bytes uploaded."""
+        if self.bEnabled:
+            self.values.append((name, time.perf_counter() - self.startTime,
+                                value))
+
+    def watch(self, owner, *names):
+        """Report the current values of the named attributes of owner."""
+        self.watched.extend((owner, name) for name in names)
+
+    def counters(self):
+        """Return a dict of the current values of the watched attributes."""
+        return {name: getattr(owner, name) for owner, name in self.watched}
+
+    def summary(self):
+        """
+        Return a dict of statistics, with times in milliseconds.
+
+        Each phase has its count, mean, median, 95th and 99th percentiles
+        and maximum; "frames" has the same for the time between frames,
+        along with the frame rate and the number of dropped frames. The
+        "latency" phase runs from a change of the parameters to the frame
+        showing it. Each other value has the same statistics, in its own
+        units, and "counters" holds the watched attributes.
+        """
+        def statistics(durations, scale=1000):
+            durations = scale * np.asarray(durations, dtype=float)
+            p50, p95, p99 = np.percentile(durations, (50, 95, 99))
+            return {"count": len(durations), "mean": durations.mean(),
+                    "p50": p50, "p95": p95, "p99": p99,
+                    "max": durations.max()}
+
+        phases = collections.defaultdict(list)
+        for name, _, duration in self.records:
+            phases[name].append(duration)
+        summary = {name: statistics(durations)
+                   for name, durations in phases.items()}
+
+        if self.frameIntervals:
+            intervals = np.asarray(self.frameIntervals)
+            summary["frames"] = statistics(intervals)
+            summary["frames"]["frameRate"] = 1 / intervals.mean()
+            summary["frames"]["dropped"] = self.droppedFrames
+
+        values = collections.defaultdict(list)
+        for name, _, value in self.values:
+            values[name].append(value)
+        for name, value in values.items():
+            summary[name] = statistics(value, scale=1)
+
+        if self.watched:
+            summary["counters"] = self.counters()
+        return summary
+
+    def summaryText(self):
+        """Return a one line summary of the frame rate, onPaint() etc."""
+        summary = self.summary()
+        text = []
+        if "frames" in summary:
+            frames = summary["frames"]
+            text.append("{:.1f} fps (p95 frame {:.1f} ms), {} dropped".format(
+                frames["frameRate"], frames["p95"], frames["dropped"]))
+        for name in ("onPaint", "onTimer", "initialiseGLFrozen", "latency"):
+            if name in summary:
+                text.append("{} {:.2f} ms (p95 {:.2f})".format(
+                    name, summary[name]["mean"], summary[name]["p95"]))
+        if "uploadBytes" in summary:
+            text.append("upload {:.1f} kB".format(
+                summary["uploadBytes"]["mean"] / 1024))
+        return " | ".join(text) or "No timings yet"
+
+    def save(self, filename):
+        """
+        Save the records to a file.
+
+        A .csv file holds one row per phase, frame, value and counter,
+        with the duration of each phase in the value column; a .json file
+        holds the summary as well as the records. Times in the records are
+        in seconds.
+        """
+        if filename.endswith(".csv"):
+            now = time.perf_counter() - self.startTime
+            with open(filename, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(("name", "start", "value"))
+                writer.writerows(self.records)
+                writer.writerows(("frame", t, 0) for t in self.frameTimes)
+                writer.writerows(self.values)
+                writer.writerows((name, now, value) for name, value
+                                 in self.counters().items())
+        else:
+            with open(filename, "w") as f:
+                json.dump({"summary": self.summary(),
+                           "records": list(self.records),
+                           "frameTimes": list(self.frameTimes),
+                           "values": list(self.values)}, f, indent=1)
+
+
+class MyGLCanvas(wxcanvas.GLCanvas):
+    """
+    Handle all drawing operations.
+
+    Parameters
+    ----------
+    parent: Parent widget - the Gui frame
+    lis: An instance of the Lissajous class
+    size_: Sets the size of the canvas
+
+    Variables
+    ----------
+    parent: Parent widget - the Gui frame
+    lissajous: An instance of the Lissajous class
+    numPoints: Number of points to draw on the Glcanvas
+    timer: The timer used to update the animation of the Lissajous curve
+    timerStep: Specifies how often to update the animation; in milliseconds
+    bClockDriven: bool specifying whether the animation speed is set by
+                  clock (in real time) or by timer events (one point per
+                  event)
+    clock: An instance of the AnimationClock class, used when bClockDriven
+    samplesPerSecond: How many points to animate per second of real time
+                      when bClockDriven
+    worker: An instance of the CurveWorker class, which computes the points
+            for frozen mode when the Lissajous parameters are changed
+    chunkSize: Number of points the worker computes between checks for a
+               newer request
+    requestTime: The time the Lissajous parameters were last changed, or
+                 None if the canvas has been initialised since
+    swapTime: The requestTime of the points swapped in but not yet drawn
+    latencies: The most recent times from a change of the parameters to
+               the frame showing it, in seconds; also recorded in timings
+               as the "latency" phase
+    paintTime: The time spent in the last call of onPaint(), in seconds
+    timings: An instance of the Timings class, recording how long each
+             part of the drawing takes when enabled, along with the bytes
+             uploaded, the latencies, the decimation and the counters of
+             the worker
+    scale: Scaling factor for rendering points
+    cycles: The most cycles for which to draw the Lissajous curve when
+            not animating; used if the curve never closes
+    pixelTolerance: How far, in pixels, the drawn curve may stray from the
+                    true curve when not animating
+    decimationCellSize: The size, in pixels, of the cells used to drop
+                        vertices which make no difference to the picture
+    decimationRatio: Number of points sampled for the last frozen curve
+                     divided by the number drawn
+    decimationTime: The time taken to decimate the last frozen curve, in
+                    seconds
+    frozenKey: The settings (parameters and canvas size) of the frozen curve
+               held in frozenBuffers
+    points: Numpy array holding the coordinates for all the points of the
+            Lissajous curve to be rendered when not animating
+    colours: Numpy array holding the colour of each point to be rendered
+             when not animating
+    trail: An instance of the Trail class, holding the points to be
+           rendered when animating
+    bHeatMap: bool specifying whether to show, behind the animation, the
+              energy the laser has deposited so far
+    heatResolution: Number of rows and columns of the heat map
+    heatSigma2: The spot-size of the laser, in both directions, used for
+                the heat map
+    heatMap: An instance of the HeatMap class, adding up the energy of each
+             animated point; None until the heat map is first shown
+    heatTexture: The HeatTexture showing heatMap on the graphics card
+    frozenBuffers: The CurveBuffers holding points and colours on the
+                   graphics card; made larger when needed
+    trailBuffers: The CurveBuffers holding trail.points and trail.colours
+                  on the graphics card
+    uploadBytes: Number of bytes sent to the graphics card for the last
+                 frame (vertices and heat map)
+    numPointsFrozen: Number of points at which the Lissajous curve is
+                     sampled when not animating; set by the adaptive
+                     sampler, before decimation
+    tFrozen: Numpy array holding the values of t at which to evaluate the
+             Lissajous curve when not animating
+    numPointsToAnimate: Number of points to render when animating
+                        the Lissajous curve
+    animationTimestep: The time resolution at which to evaluate the
+                       Lissajous curve when animating
+    currentTimestep: The current timestep at which to evaluate the
+                     Lissajous curve when animating
+    bFrozen: bool specifying whether in animating or frozen mode
+    bInitialised: bool specifying if canvas has been initialised
+    context: The GL context
+
+    Methods
+    --------------
+    initialiseGL(self): Configures the OpenGL context and modelview matrix
+    initialiseGLFrozen(self): Sets up the points array for rendering in
+                              frozen mode
+    reserveFrozenBuffers(self, numPoints): Make sure frozenBuffers can hold
+                                           numPoints vertices
+    frozenRequest(self): The settings needed to compute the frozen curve
+    initialiseGLAnimate(self): Sets up the trail for animating
+    onPaint(self, event): Handles the paint event and drawing operations
+    parametersChanged(self): Redraw after the Lissajous parameters have
+                             changed
+    requestFrozenCurve(self): Ask the worker for the points for frozen mode
+    computeFrozenPoints(self, request, cancelled): Compute and decimate
+        the points for frozen mode; run by the worker
+    onCurveComputed(self, request, curve): Hand the worker's curve over to
+                                           the GUI thread
+    swapFrozenPoints(self, request, curve): Upload the worker's points and
+                                            redraw
+    useFrozenCurve(self, request, curve): Upload the points for frozen mode
+    onInitialTimer(self, event): Start animation drawing from 0 to
+                                 numPointsToAnimate points
+    onTimer(self, event): Proceed with animation
+    advanceAnimation(self): Add the next point(s) to the trail; returns
+                            False if it isn't yet time for a new frame
+    addAnimationPoints(self, n): Add the next n points to the trail
+    showHeatMap(self, bShow): Show or hide the heat map
+    resetHeatMap(self): Start the heat map again from zero
+    heatScale(self): The energy to show in full colour when the heat map
+                     starts
+    displayRefreshRate(self): The refresh rate of the canvas' display
+    stopAnimate(self): Stop the animation
+    onDestroy(self, event): Stop the worker thread
+    """
+
+    def __init__(self, parent, lis, size_=(600, 600)):
+        """Initialise canvas properties and useful variables."""
+        # Initialise the canvas
+        super().__init__(parent, -1,
+                         size=size_,
+                         attribList=[wxcanvas.WX_GL_RGBA,
+                                     wxcanvas.WX_GL_DOUBLEBUFFER,
+                                     wxcanvas.WX_GL_DEPTH_SIZE, 16, 0])
+
+        # Initialise the class variables
+        self.parent = parent
+        self.lissajous = lis
+        self.timer = wx.Timer(self)
+        self.timerStep = 10
+        self.scale = 0.75
+
+        # By default animate at the speed of one point every timerStep
+        self.bClockDriven = True
+        self.samplesPerSecond = 1000 / self.timerStep
+        self.clock = AnimationClock(self.samplesPerSecond)
+
+        # Frozen mode curves are computed in the background when the
+        # parameters change, and timed from the change to the frame
+        self.worker = CurveWorker(self.computeFrozenPoints)
+        self.chunkSize = 2048
+        self.requestTime = None
+        self.swapTime = None
+        self.latencies = collections.deque(maxlen=100)
+        self.paintTime = 0
+        self.timings = Timings()
+        self.timings.watch(self.worker, "numSubmitted", "numComputed",
+                           "numCancelled")
+
+        # The number of points in frozen mode depends on the curve;
+        # the arrays are filled in by initialiseGLFrozen()
+        self.cycles = 10
+        self.pixelTolerance = 0.25
+        self.decimationCellSize = 0.5
+        self.decimationRatio = 1
+        self.decimationTime = 0
+        self.frozenKey = None
+        self.numPointsFrozen = 0
+        self.tFrozen = np.zeros(0)
+        self.points = np.zeros((0, 2), dtype=np.float32)
+        self.colours = np.ones((0, 3), dtype=np.float32)
+
+        self.numPointsToAnimate = 1000
+        self.animationTimestep = 2 * np.pi / (1000)
+        self.currentTimestep = 0
+        self.trail = Trail(self.numPointsToAnimate)
+
+        # The heat map is off until asked for
+        self.bHeatMap = False
+        self.heatResolution = 256
+        self.heatSigma2 = 0.005
+        self.heatMap = None
+
+        # The vertex buffers are created once there is a GL context
+        self.frozenBuffers = None
+        self.trailBuffers = None
+        self.heatTexture = None
+        self.uploadBytes = 0
+
+        self.numPoints = 0
+        self.bFrozen = True
+
+        # Set the context to the canvas
+        # Bind the paint method, onPaint, to the paint event
+        self.bInitialised = False
+        self.context = wxcanvas.GLContext(self)
+        self.Bind(wx.EVT_PAINT, self.onPaint)
+        self.Bind(wx.EVT_WINDOW_DESTROY, self.onDestroy)
+
+    def initialiseGL(self):
+        """Configure the OpenGL context and modelview matrix."""
+        # Make the OpenGL state, represented by context, current
+        self.SetCurrent(self.context)
+
+        # Get the size of the canvas
+        size = self.GetClientSize()
+
+        # Enable the use of arrays to draw out all the vertices efficiently
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glEnableClientState(GL.GL_COLOR_ARRAY)
+
+        # Set up the canvas (in this case a black background) for 2D drawings
+        GL.glClearColor(0.0, 0.0, 0.0, 0.0)
+        GL.glViewport(0, 0, size.width, size.height)
+        GL.glMatrixMode(GL.GL_PROJECTION)
+        GL.glLoadIdentity()
+        GL.glOrtho(-size.width, size.width, -size.height, size.height, 0, 1)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+        # A curve still being computed by the worker was asked for before
+        # the mode (or size) changed, so make sure it is never swapped in
+        self.requestTime = None
+
+        # Finish initialisation based on the mode, i.e. animation on or off
+        if self.bFrozen:
+            self.initialiseGLFrozen()     # Animation off
+        else:
+            self.initialiseGLAnimate()    # Animation on
+
+    def initialiseGLFrozen(self):
+        """Set up the points array for rendering in frozen mode."""
+        self.SetCurrent(self.context)
+
+        # The curve is only computed again if the parameters or the size
+        # of the canvas have changed; otherwise the buffers are up to date
+        with self.timings.phase("initialiseGLFrozen"):
+            request = self.frozenRequest()
+            if request["key"] != self.frozenKey:
+                self.useFrozenCurve(request, self.computeFrozenPoints(
+                    request, threading.Event()))
+            self.numPoints = len(self.points)
+
+        # Call Refresh() to post the paint event and redraw the screen
+        self.bInitialised = True
+        self.Refresh()
+
+    def reserveFrozenBuffers(self, numPoints):
+        """Make sure the frozen mode buffers can hold numPoints vertices."""
+        if (self.frozenBuffers is not None and
+                self.frozenBuffers.capacity >= numPoints):
+            return
+
+        # Leave room to grow, so the buffers aren't made again every time
+        # the parameters change a little
+        if self.frozenBuffers is not None:
+            self.frozenBuffers.delete()
+        capacity = numPoints + numPoints // 2
+
+        # The colours (all white) are sent over now and never change
+        self.colours = np.ones((capacity, 3), dtype=np.float32)
+        self.frozenBuffers = CurveBuffers(capacity, self.colours)
+
+    def frozenRequest(self):
+        """
+        Return the settings needed to compute the frozen curve.
+
+        The worker is given a copy of the parameters, since the Lissajous
+        instance may change again while it is working. The settings which
+        decide the curve are also gathered into a key.
+        """
+        size = self.GetClientSize()
+        request = {"xFreq": self.lissajous.xFreq,
+                   "yFreq": self.lissajous.yFreq,
+                   "delta": self.lissajous.delta,
+                   "width": size.width,
+                   "height": size.height,
+                   "xScale": size.width * self.scale,
+                   "yScale": size.height * self.scale}
+        request["key"] = (tuple(request.values()) +
+                          (self.pixelTolerance, self.cycles,
+                           self.decimationCellSize))
+        request["time"] = time.perf_counter()
+        return request
+
+    def initialiseGLAnimate(self):
+        """Set up the trail of points for animating."""
+        self.SetCurrent(self.context)
+
+        # Empty the trail, making a new one if its length has been changed
+        if self.trail.length != self.numPointsToAnimate:
+            self.trail = Trail(self.numPointsToAnimate)
+        self.trail.clear()
+
+        # Make space for the trail on the graphics card
+        # The colours are sent over now and never change
+        if (self.trailBuffers is None or
+                self.trailBuffers.capacity != self.trail.length + 1):
+            if self.trailBuffers is not None:
+                self.trailBuffers.delete()
+            self.trailBuffers = CurveBuffers(self.trail.length + 1,
+                                             self.trail.colours)
+
+        # Calculate the first vertex in the Lissajous curve
+        # and insert it into the trail
+        self.currentTimestep = 0
+        if self.bHeatMap:
+            self.resetHeatMap()
+        self.addAnimationPoints(1)
+
+        self.bInitialised = True
+
+        # Time the frames of the animation from its first frame
+        self.timings.pauseFrames()
+
+        # Start a timer that notifies the canvas every timerStep milliseconds
+        # This causes the onInitialTimer() function to be called
+        # When driven by the clock, the timer just needs to go off often
+        # enough not to miss a frame at the display's refresh rate
+        if self.bClockDriven:
+            self.clock.refreshRate = self.displayRefreshRate()
+            self.clock.samplesPerSecond = self.samplesPerSecond
+            self.clock.start()
+            self.timer.Start(max(1, int(500 / self.clock.refreshRate)))
+        else:
+            self.timer.Start(self.timerStep)
+        self.Bind(wx.EVT_TIMER, self.onInitialTimer)
+
+    def onPaint(self, event):
+        """Handle the paint event and drawing operations."""
+        paintStart = time.perf_counter()
+        self.SetCurrent(self.context)
+
+        # Make sure the canvas has been initialised;
+        if not self.bInitialised:
+            self.initialiseGL()
+
+        # OpenGL, in this case, uses a "double bufferring" system:
+        # it displays one buffer whilst drawing to the other.
+        # Clear the current back buffer
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+
+        # Draw the points stored in the vertex buffers onto the buffer
+        if self.bFrozen and self.numPoints:
+            with self.timings.phase("draw"):
+                self.frozenBuffers.draw(0, self.numPoints)
+        else:
+            # Only send over the points, and the part of the heat map,
+            # which have changed
+            with self.timings.phase("upload"):
+                for start, stop in self.trail.takeChanges():
+                    self.trailBuffers.uploadPoints(
+                        self.trail.points[start:stop], start)
+                if self.bHeatMap:
+                    if self.heatTexture is None:
+                        self.heatTexture = HeatTexture(
+                            self.heatResolution, self.heatResolution,
+                            self.heatScale())
+                    self.heatTexture.uploadEnergy(
+                        self.heatMap.energy, self.heatMap.takeChanges(),
+                        self.heatMap.peak)
+
+            # The heat map goes behind the trail,
+            # which is drawn in (at most) two parts
+            with self.timings.phase("draw"):
+                if self.bHeatMap:
+                    size = self.GetClientSize()
+                    self.heatTexture.draw(size.width, size.height)
+                for start, count, colour in self.trail.spans():
+                    self.trailBuffers.draw(start, count, colour)
+
+        # Keep track of how much was sent to the graphics card
+        self.uploadBytes = 0
+        for buffers in (self.frozenBuffers, self.trailBuffers,
+                        self.heatTexture):
+            if buffers is not None:
+                self.uploadBytes += buffers.endFrame()
+        self.timings.value("uploadBytes", self.uploadBytes)
+
+        # Now make the back buffer the front buffer
+        # i.e. this is now displayed on the screen
+        with self.timings.phase("swapBuffers"):
+            GL.glFlush()
+            self.SwapBuffers()
+
+        # Time how long it took for a change of parameters to be shown
+        now = time.perf_counter()
+        if self.swapTime is not None:
+            self.latencies.append(now - self.swapTime)
+            if self.timings.bEnabled:
+                self.timings.records.append(
+                    ("latency", self.swapTime - self.timings.startTime,
+                     now - self.swapTime))
+            self.swapTime = None
+        self.paintTime = now - paintStart
+        if self.timings.bEnabled:
+            self.timings.records.append(
+                ("onPaint", paintStart - self.timings.startTime,
+                 self.paintTime))
+
+            # Frozen frames are only drawn when something changes,
+            # so the time between them says nothing about the frame rate
+            if self.bFrozen:
+                self.timings.pauseFrames()
+            else:
+                self.timings.frame(self.clock.refreshRate)
+
+    def parametersChanged(self):
+        """Redraw the curve after the Lissajous parameters have changed."""
+        if self.bFrozen and self.bInitialised:
+            # Compute the new curve without holding up the GUI
+            self.requestFrozenCurve()
+        else:
+            # Restart the animation with the new parameters
+            self.bInitialised = False
+            self.Refresh()
+
+    def requestFrozenCurve(self):
+        """Ask the worker to compute the points for frozen mode."""
+        request = self.frozenRequest()
+        self.requestTime = request["time"]
+        self.worker.submit(request, self.onCurveComputed)
+
+    def computeFrozenPoints(self, request, cancelled):
+        """
+        Compute the points for frozen mode in the worker thread.
+
+        The values of t and the points are written into new arrays, which
+        are only swapped in once they are finished. The points which would
+        make no difference to the picture are then dropped. Return None if
+        the request is cancelled.
+        """
+        lissajous = Lissajous(request["xFreq"], request["yFreq"],
+                              request["delta"])
+        start = time.perf_counter()
+        curve = frozenCurve(lissajous, request["xScale"], request["yScale"],
+                            origin=(-request["width"], -request["height"]),
+                            pixelTolerance=self.pixelTolerance,
+                            maxCycles=self.cycles,
+                            cellSize=self.decimationCellSize,
+                            chunkSize=self.chunkSize, cancelled=cancelled)
+
+        if curve is not None and self.timings.bEnabled:
+            start -= self.timings.startTime
+            self.timings.records.append(
+                ("sample", start, curve["sampleTime"]))
+            self.timings.records.append(
+                ("decimation", start + curve["sampleTime"],
+                 curve["decimationTime"]))
+            self.timings.value("decimationRatio",
+                               curve["numSampled"] / len(curve["points"]))
+        return curve
+
+    def onCurveComputed(self, request, curve):
+        """Hand the curve computed by the worker over to the GUI thread."""
+        wx.CallAfter(self.swapFrozenPoints, request, curve)
+
+    def swapFrozenPoints(self, request, curve):
+        """Upload the values of t and points computed by the worker."""
+        # Ignore points which are out of date, or if the canvas is gone
+        if (not self or request["time"] != self.requestTime or
+                not self.bFrozen or not self.bInitialised):
+            return
+
+        self.SetCurrent(self.context)
+        self.useFrozenCurve(request, curve)
+        self.numPoints = len(self.points)
+
+        self.swapTime = request["time"]
+        self.Refresh()
+
+    def useFrozenCurve(self, request, curve):
+        """Send the points of a newly computed frozen curve to the card."""
+        self.tFrozen = curve["t"]
+        self.points = curve["points"]
+        self.numPointsFrozen = curve["numSampled"]
+        self.decimationRatio = self.numPointsFrozen / len(self.points)
+        self.decimationTime = curve["decimationTime"]
+
+        self.reserveFrozenBuffers(len(self.points))
+        self.frozenBuffers.uploadPoints(self.points)
+        self.frozenKey = request["key"]
+
+    def onInitialTimer(self, event):
+        """Start animation drawing from 0 to numPointsToAnimate points."""
+        # Check the number of points calculated and animated so far
+        if self.trail.count < self.numPointsToAnimate:
+            # Calculate the next vertex and add it to the trail
+            # Call Refresh() to post the paint event and redraw the screen
+            with self.timings.phase("onInitialTimer"):
+                if self.advanceAnimation():
+                    self.Refresh()
+
+        else:
+            # The trail is full, so from now on each new point
+            # replaces the oldest one
+            # Stop the timer calling onInitialTimer() every cycle
+            interval = self.timer.GetInterval()
+            self.timer.Stop()
+            self.Unbind(wx.EVT_TIMER)
+
+            # Start the timer again
+            # This causes the onTimer() function to be called each cycle
+            self.timer.Start(interval)
+            self.Bind(wx.EVT_TIMER, self.onTimer)
+
+    def onTimer(self, event):
+        """Proceed with animation."""
+        # Calculate the next vertex to draw
+        # This overwrites the oldest point in the trail
+        # Call Refresh() to post the paint event and redraw the screen
+        with self.timings.phase("onTimer"):
+            if self.advanceAnimation():
+                self.Refresh()
+
+    def advanceAnimation(self):
+        """
+        Add the next point(s) of the animation to the trail.
+
+        When driven by the clock, as many points are added as are needed to
+        keep up with samplesPerSecond, but only once it is time for a new
+        frame; otherwise one point is added. Return whether the canvas
+        needs redrawing.
+        """
+        if not self.bClockDriven:
+            self.addAnimationPoints(1)
+            return True
+
+        if not self.clock.due():
+            return False
+        self.addAnimationPoints(self.clock.advance())
+        return True
+
+    def addAnimationPoints(self, n):
+        """Add the next n points of the curve to the animation trail."""
+        size = self.GetClientSize()
+        self.currentTimestep = advanceTrail(
+            self.trail, self.lissajous, self.currentTimestep, n,
+            self.animationTimestep, xScale=size.width * self.scale,
+            yScale=size.height * self.scale,
+            heatMap=self.heatMap if self.bHeatMap else None)
+
+    def showHeatMap(self, bShow):
+        """Show or hide the heat map, starting it again from zero."""
+        self.bHeatMap = bShow
+        if bShow:
+            self.resetHeatMap()
+        self.Refresh()
+
+    def resetHeatMap(self):
+        """Start the heat map again from zero, e.g. for new parameters."""
+        # The grid covers the whole canvas, in the units of the curve
+        if self.heatMap is None:
+            self.heatMap = HeatMap(self.heatResolution, self.heatResolution,
+                                   1 / self.scale, 1 / self.scale,
+                                   self.heatSigma2, self.heatSigma2)
+        self.heatMap.clear()
+        if self.heatTexture is not None:
+            self.heatTexture.scale = self.heatScale()
+
+    def heatScale(self):
+        """
+        Return the energy to show in full colour when the heat map starts.
+
+        This is the energy left by one pass of the beam at its average
+        speed, so the curve shows up straight away; the texture doubles
+        the scale as the energy builds up.
+        """
+        speed = np.hypot(self.lissajous.xFreq, self.lissajous.yFreq)
+        return self.heatMap.passEnergy(speed / np.sqrt(2))
+
+    def displayRefreshRate(self):
+        """Return the refresh rate of the canvas' display, in Hz."""
+        index = wx.Display.GetFromWindow(self)
+        display = wx.Display(index if index != wx.NOT_FOUND else 0)
+        refresh = display.GetCurrentMode().refresh
+
+        # The refresh rate isn't always known
+        return refresh if refresh > 0 else 60
+
+    def stopAnimate(self):
+        """Stop the animation."""
+        self.timer.Stop()
+        self.Unbind(wx.EVT_TIMER)
+
+    def onDestroy(self, event):
+        """Stop the worker thread when the canvas is destroyed."""
+        self.worker.stop()
+        event.Skip()
+
+
+class FrequencySlider(wx.Panel):
+    """
+    Implement frequency control for Lissajous curve.
+
+    Parameters
+    ----------
+    parent: Parent widget - the control panel
+    label_: Label for the panel
+    value_: Initial value for the frequency
+    style_: The panel's style
+    min_: The lower limit of the allowed frequency range
+    max_: The upper limit of the allowed frequency range
+
+    Variables
+    ---------
+    value: The desired frequency value
+    slider: The wx.Slider object to allow the user to specify the frequency
+    spinCtrl: The wx.SpinCtrlDouble object to allow the user to specify the
+              frequency
+    label: Label for the panel
+    vbox: The layout sizer for slider and spinCtrl
+    hbox: The layout sizer for the panel
+
+    Methods
+    -------
+    onSlider(self, event): Handles the slider event
+    onSpin(self, event): Handles the spin event
+    """
+
+    def __init__(self, parent, label_, value_=1,
+                 style_=wx.SL_HORIZONTAL, min_=1, max_=30):
+        """Initialise and lay out the panel."""
+        # Initialise the panel
+        super().__init__(parent)
+
+        self.value = value_
+
+        # Initialise the slider control, the spin box, and the label
+        self.slider = wx.Slider(self, value=value_, style=style_,
+                                minValue=min_ * 10, maxValue=max_ * 10)
+        self.spinCtrl = wx.SpinCtrlDouble(self, initial=value_,
+                                          min=min_, max=max_, inc=0.1)
+        self.label = wx.StaticText(self, label=label_)
+
+        # Lay out the slider and spin box vertically
+        # i.e. slider on top of spin box
+        self.vbox = wx.BoxSizer(wx.VERTICAL)
+        self.vbox.Add(self.slider, 1, wx.EXPAND | wx.ALIGN_CENTRE_HORIZONTAL)
+        self.vbox.AddSpacer(10)
+        self.spinCtrl.SetSize(self.slider.GetSize())
+        self.vbox.Add(self.spinCtrl, 1,
+                      wx.EXPAND | wx.ALIGN_CENTRE_HORIZONTAL)
+
+        # Lay out the slider and spin box next to the label
+        self.hbox = wx.BoxSizer(wx.HORIZONTAL)
+        self.hbox.AddSpacer(5)
+        self.hbox.Add(self.label, 1, wx.ALIGN_CENTRE_VERTICAL)
+        self.hbox.AddSpacer(20)
+        self.hbox.Add(self.vbox)
+        self.SetSizer(self.hbox)
+
+        # When the slider or spin box is used, react accordingly
+        self.slider.Bind(wx.EVT_SLIDER, self.onSlider)
+        self.spinCtrl.Bind(wx.EVT_SPINCTRLDOUBLE, self.onSpin)
+
+    def onSlider(self, event):
+        """Handle the slider event."""
+        # The slider values are ints
+        # Divide by ten to get the specified range [1.0, 30.0]
+        self.value = self.slider.GetValue() / 10
+
+        # Make sure the spin control is set to the corresponding value
+        self.spinCtrl.SetValue(self.value)
+
+        wx.PostEvent(self, FrequencySliderEvent())
+
+    def onSpin(self, event):
+        """Handle the spin event."""
+        self.value = self.spinCtrl.GetValue()
+
+        # Make sure the slider is set to the correct position
+        self.slider.SetValue(int(self.value * 10))
+
+        # Tell the application this controller has been used
+        wx.PostEvent(self, FrequencySliderEvent())
+
+
+class PhaseShiftSlider(wx.Panel):
+    """
+    Implement phase shift control for the Lissajous curve.
+
+    Parameters
+    ----------
+    parent: Parent widget - the control panel
+
+    Variables
+    ---------
+    slider: The wx.Slider object to allow the user to specify the phase shift
+    value: The phase shift amount
+    valueLabel: The text displaying the phase shift amount
+    labels: List holding the strings for valueLabel
+    box: The layout sizer for the panel
+
+    Methods
+    -------
+    onSlider(self, event): Handles the slider event
+    """
+
+    def __init__(self, parent):
+        """Initialise and lay out the panel."""
+        # Initialise the panel
+        super().__init__(parent)
+
+        # Initialise the slider control
+        self.slider = wx.Slider(self, value=0, minValue=0,
+                                maxValue=24, style=wx.SL_AUTOTICKS)
+        self.value = 0
+
+        # Initialise the accompanying value label
+        # These are stored as strings in a list
+        # "\u030" is unicode for the pi symbol
+        self.valueLabel = wx.StaticText(self, label="0 rad")
+        self.labels = [str(i) + "\u03c0 / 12 rad" for i in range(25)]
+        self.labels[0] = "0 rad"
+        self.labels[12] = "\u03c0 rad"
+        self.labels[24] = "2\u03c0 rad"
+
+        # Lay out the slider and value label
+        self.box = wx.BoxSizer(wx.HORIZONTAL)
+        self.box.AddSpacer(5)
+        self.box.Add(self.slider)
+        self.box.AddSpacer(10)
+        self.box.Add(self.valueLabel)
+        self.SetSizer(self.box)
+
+        # When the slider is used, react accordingly
+        self.slider.Bind(wx.EVT_SLIDER, self.onSlider)
+
+    def onSlider(self, event):
+        """"Handle the slider event."""
+        v = self.slider.GetValue()
+
+        # Make sure the value label is updated
+        self.value = np.pi * v / 12
+        self.valueLabel.SetLabel(self.labels[v])
+
+        # Tell the application this controller has been used
+        wx.PostEvent(self, PhaseShiftSliderEvent())
+
+
+class AnimationControls(wx.Panel):
+    """
+    Implement animation controls; to stop, start and reset the animation.
+
+    Parameters
+    ----------
+    parent: Parent widget - the control panel
+
+    Variables
+    ---------
+    bReset: bool specifying whether the animation should be reset
+    bAnimate: bool specifying whether in animation or frozen mode
+    animateButton: The wx.Button object allowing the user to turn
+                   the animation mode on/off
+    resetButton: The wx.Button object allowing the user to reset
+                 the animation
+    box: The layout sizer for the panel
+
+    Methods
+    -------
+    onAnimateButton(self, event): Handles the animation button event
+    onResetButton(self, event): Handles the reset button event
+    """
+
+    def __init__(self, parent):
+        """Initialise and lay out the panel."""
+        # Initialise the panel
+        super().__init__(parent)
+        self.bReset = False
+        self.bAnimate = False
+
+        # Initialise the animate and reset buttons
+        self.animateButton = wx.Button(self, label="Turn animation on ")
+        self.resetButton = wx.Button(self, label="Reset")
+        self.resetButton.Disable()
+
+        # Lay out the buttons
+        self.box = wx.BoxSizer(wx.HORIZONTAL)
+        self.box.AddSpacer(5)
+        self.box.Add(self.animateButton)
+        self.box.AddSpacer(20)
+        self.box.Add(self.resetButton)
+        self.box.AddSpacer(5)
+        self.SetSizer(self.box)
+
+        # When the buttons have been clicked, react accordingly
+        self.animateButton.Bind(wx.EVT_BUTTON, self.onAnimateButton)
+        self.resetButton.Bind(wx.EVT_BUTTON, self.onResetButton)
+
+    def onAnimateButton(self, event):
+        """Handle the animation button event."""
+        if self.bAnimate:
+            # Was animating, so now need to stop animating
+            self.bAnimate = False
+            self.animateButton.SetLabel("Turn animation on ")
+
+            # Reset only available when animating
+            self.resetButton.Disable()
+
+        else:
+            # Wasn't animating so now need to start animating
+            self.bAnimate = True
+            self.animateButton.SetLabel("Turn animation off")
+
+            # Reset now available
+            self.resetButton.Enable()
+
+        # Tell the application a button has been clicked
+        wx.PostEvent(self, AnimationControlEvent())
+
+    def onResetButton(self, event):
+        """Handle the reset button event."""
+        self.bReset = True
+        wx.PostEvent(self, AnimationControlEvent())
+
+
+class Control(wx.Panel):
+    """
+    Implement the control panel.
+
+    Parameters
+    ----------
+    parent: Parent widget - the Gui frame
+    lis: An instance of the Lissajous class
+    glcan: An instance of the MyGLCanvas class
+
+    Variables
+    ---------
+    lissajous: An instance of the Lissajous class
+    canvas: An instance of the MyGLCanvas class
+    xSlider: The controls for the x frequency
+    ySlider: The controls for the y frequency
+    freqControlBox: Layout sizer for the frequency controls
+    deltaSlider: The slider control for the phase shift
+    phaseControlBox: Layout sizer for the phase control
+    animationButtons: The controls for the animation
+    animationControlBox: Layout sizer for the animation controls
+    box: The layout sizer for the panel
+
+    Methods
+    -------
+    onXSlider(self, event): Handles the event the x frequency has been changed
+    onYSlider(self, event): Handles the event the y frequency has been changed
+    onDeltaSlider(self, event): Handles the event the phase shift has been
+                                changed
+    onAnimationButtons(self, event): Handles the event an animation control
+                                     button has been clicked
+    """
+
+    def __init__(self, parent, lis, glcan):
+        """Initialise and lay out the panel."""
+        # Initialise the panel
+        super().__init__(parent)
+
+        self.lissajous = lis
+        self.canvas = glcan
+
+        # Initialise the frequency controllers and lay them out
+        self.xSlider = FrequencySlider(self, "x frequency:",
+                                       value_=self.lissajous.xFreq)
+        self.ySlider = FrequencySlider(self, "y frequency:",
+                                       value_=self.lissajous.yFreq)
+        self.freqControlBox = wx.StaticBoxSizer(wx.VERTICAL, self,
+                                                "Frequency Controls")
+        self.freqControlBox.AddSpacer(10)
+        self.freqControlBox.Add(self.xSlider)
+        self.freqControlBox.AddSpacer(30)
+        self.freqControlBox.Add(self.ySlider)
+        self.freqControlBox.AddSpacer(10)
+
+        # Initialise the phase shift controller and lay it out
+        self.deltaSlider = PhaseShiftSlider(self)
+        self.phaseControlBox = wx.StaticBoxSizer(wx.VERTICAL, self,
+                                                 "Phase shift control")
+        self.phaseControlBox.AddSpacer(10)
+        self.phaseControlBox.Add(self.deltaSlider, 0, wx.EXPAND)
+        self.phaseControlBox.AddSpacer(10)
+
+        # Initialise the animation controller and lay it out
+        self.animationButtons = AnimationControls(self)
+        self.animationControlBox = wx.StaticBoxSizer(wx.VERTICAL, self,
+                                                     "Animation controls")
+        self.animationControlBox.AddSpacer(10)
+        self.animationControlBox.Add(self.animationButtons)
+        self.animationControlBox.AddSpacer(10)
+
+        # Lay out the entire panel
+        self.box = wx.BoxSizer(wx.VERTICAL)
+        self.box.AddStretchSpacer(2)
+        self.box.Add(self.freqControlBox, 0, wx.EXPAND)
+        self.box.AddStretchSpacer(1)
+        self.box.Add(self.phaseControlBox, 0, wx.EXPAND)
+        self.box.AddStretchSpacer(1)
+        self.box.Add(self.animationControlBox, 0, wx.EXPAND)
+        self.box.AddStretchSpacer(2)
+        self.SetSizer(self.box)
+
+        # When any of the controllers have been used, react accordingly
+        self.xSlider.Bind(EVT_FSLIDER, self.onXSlider)
+        self.ySlider.Bind(EVT_FSLIDER, self.onYSlider)
+        self.deltaSlider.Bind(EVT_PSLIDER, self.onDeltaSlider)
+        self.animationButtons.Bind(EVT_ACONTROL, self.onAnimationButtons)
+
+    def onXSlider(self, event):
+        """Handle the event the x frequency has been changed."""
+        # Set the new x angular frequency
+        self.lissajous.xFreq = self.xSlider.value
+
+        # Redraw the canvas
+        self.canvas.parametersChanged()
+
+    def onYSlider(self, event):
+        """Handle the event the y frequency has been changed."""
+        # Set the new y angular frequency
+        self.lissajous.yFreq = self.ySlider.value
+
+        # Redraw the canvas
+        self.canvas.parametersChanged()
+
+    def onDeltaSlider(self, event):
+        """Handle the event the phase shift has been changed."""
+        # Set the new phase shift
+        self.lissajous.delta = self.deltaSlider.value
+
+        # Redraw the canvas
+        self.canvas.parametersChanged()
+
+    def onAnimationButtons(self, event):
+        """Handle the event an animation control button has been clicked."""
+        # If animating, stop
+        self.canvas.stopAnimate()
+
+        if self.animationButtons.bReset:
+            # Reset was clicked
+            self.animationButtons.bReset = False
+
+        else:
+            # Animation on/off was clicked
+            self.canvas.bFrozen = not self.animationButtons.bAnimate
+
+        # Re-initialise the canvas in the correct drawing mode
+        self.canvas.bInitialised = False
+        self.canvas.Refresh()
+
+
+class Gui(wx.Frame):
+    """The main window.
+
+    Parameters
+    ----------
+    title: Title of the window
+    lis: An instance of the Lissajous class
+    traceFile: If given, record the timings and save them to this .json or
+               .csv file on exit
+
+    Variables
+    ---------
+    lissajous: An instance of the Lissajous class
+    canvas: An instance of the MyGLCanvas class
+    control: The control panel
+    box: The layout sizer for the panel
+    traceFile: Where to save the timings on exit, or None
+    statusBar: Shows the timings, when toggled with F3
+    statsTimer: The timer used to update the timings in the status bar
+
+    Methods
+    -------
+    onKey(self, event): Toggles the timings in the status bar with F3,
+                        and the heat map with F4
+    onStatsTimer(self, event): Updates the timings in the status bar
+    onClose(self, event): Saves the timings, if recorded, on exit
+    """
+
+    def __init__(self, title, lis, traceFile=None):
+        """Initialise the GUI."""
+        super().__init__(parent=None,
+                         title=title,
+                         style=(wx.DEFAULT_FRAME_STYLE &
+                                ~(wx.RESIZE_BORDER | wx.MAXIMIZE_BOX)))
+
+        self.lissajous = lis
+        self.canvas = MyGLCanvas(self, self.lissajous)
+        self.control = Control(self, self.lissajous, self.canvas)
+
+        # Lay out control panel and canvas
+        box = wx.BoxSizer(wx.HORIZONTAL)
+        box.Add(self.canvas, 0)
+        box.Add(self.control, 0, wx.EXPAND)
+        self.SetSizerAndFit(box)
+
+        # Record the timings if asked to; they can be shown at any time
+        self.traceFile = traceFile
+        self.canvas.timings.bEnabled = traceFile is not None
+        self.statusBar = self.CreateStatusBar()
+        self.statusBar.Hide()
+        self.statsTimer = wx.Timer(self)
+        self.Bind(wx.EVT_TIMER, self.onStatsTimer, self.statsTimer)
+        self.Bind(wx.EVT_CHAR_HOOK, self.onKey)
+        self.Bind(wx.EVT_CLOSE, self.onClose)
+
+    def onKey(self, event):
+        """Toggle the timings with F3, and the heat map with F4."""
+        if event.GetKeyCode() == wx.WXK_F4:
+            self.canvas.showHeatMap(not self.canvas.bHeatMap)
+            return
+        if event.GetKeyCode() != wx.WXK_F3:
+            event.Skip()
+            return
+
+        if self.statusBar.IsShown():
+            self.statsTimer.Stop()
+            self.statusBar.Hide()
+        else:
+            # Start recording, if not already
+            self.canvas.timings.bEnabled = True
+            self.statusBar.Show()
+            self.statsTimer.Start(500)
+        self.SendSizeEvent()
+
+    def onStatsTimer(self, event):
+        """Update the timings in the status bar."""
+        self.statusBar.SetStatusText(self.canvas.timings.summaryText())
+
+    def onClose(self, event):
+        """Save the timings, if they were recorded, on exit."""
+        self.statsTimer.Stop()
+        if self.traceFile is not None:
+            self.canvas.timings.save(self.traceFile)
+        event.Skip()
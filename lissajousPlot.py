@@ -4,10 +4,17 @@ Lissajous curve sketcher (using Matplotlib.pyplot).
 This script plots a Lissajous figure and provides a graphical user
 interface to allow the user to vary the parameters in the Lissajous
 parametric equations.
+
+To keep the sliders responsive, only the curve and the slider which has
+moved are redrawn (using blitting) rather than the whole figure, and the
+curve is calculated into arrays which are kept from one update to the
+next. Blitting is only used where the canvas supports it; set bBlit to
+False to redraw the whole figure every time instead.
 """
 
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.transforms import Bbox
 from matplotlib.widgets import Slider
 
 
@@ -15,23 +22,52 @@ from matplotlib.widgets import Slider
 fig, ax = plt.subplots()
 plt.subplots_adjust(left=0.25, bottom=0.25)
 
+# Whether to only redraw the parts of the figure which change
+# (canvases which cannot blit redraw the whole figure instead)
+bBlit = fig.canvas.supports_blit
+
+# The values of t for each number of cycles, and the arrays to hold the
+# coordinates for each number of points, are only made once
+tGrids = {}
+buffers = {}
+
+
+def tGrid(num):
+    """Return the values of t for num cycles."""
+    if num not in tGrids:
+        tGrids[num] = np.linspace(0, 2 * num * np.pi, int(1000 * num))
+        tGrids[num].flags.writeable = False
+    return tGrids[num]
+
+
+def coordinateBuffers(numPoints):
+    """Return the arrays used to hold numPoints x and y coordinates."""
+    if numPoints not in buffers:
+        buffers[numPoints] = (np.empty(numPoints), np.empty(numPoints))
+    return buffers[numPoints]
+
+
 # Initialise the array for values of t
-t = np.linspace(0, 2 * np.pi, 1000)
+t = tGrid(1)
 
 
 # Define the functions x(t) and y(t)
-def x(omegaX, t):
+# If out is given the result is written into it, rather than a new array
+def x(omegaX, t, out=None):
     """Calculate the Lissajous x coordinate."""
-    return np.sin(omegaX * t)
+    out = np.multiply(omegaX, t, out=out)
+    return np.sin(out, out=out)
 
 
-def y(omegaY, phi, t):
+def y(omegaY, phi, t, out=None):
     """Calculate the Lissajous y coordinate."""
-    return np.sin(omegaY * t + phi)
+    out = np.multiply(omegaY, t, out=out)
+    out += phi
+    return np.sin(out, out=out)
 
 
 # Initial plot
-graph, = plt.plot(x(1, t), y(1, 0, t))
+graph, = plt.plot(x(1, t), y(1, 0, t), animated=bBlit)
 
 # Lay out the plot and the sliders used to modify the plot
 axOmegaX = plt.axes([0.25, 0.15, 0.65, 0.03])
@@ -48,6 +84,69 @@ sDelta = Slider(axDelta, 'Phase shift', 0, 2 * np.pi,
                 valinit=0, valstep=np.pi / 12)
 sNum = Slider(axNum, 'Number of cycles', 0.5, 10,
               valinit=1, valstep=0.5)
+sliders = (sOmegaX, sOmegaY, sDelta, sNum)
+
+# When blitting, the sliders are drawn by redraw() rather than by
+# redrawing the whole figure, and the figure is drawn without them
+for slider in sliders:
+    slider.drawon = not bBlit
+    slider.ax.set_animated(bBlit)
+
+# The figure without the curve and sliders, saved by onDraw(),
+# and the slider values last drawn
+background = None
+drawnValues = {}
+
+
+def sliderRegion(slider):
+    """Return the strip of the figure holding a slider and its labels."""
+    return Bbox.from_extents(fig.bbox.x0, slider.ax.bbox.y0 - 4,
+                             fig.bbox.x1, slider.ax.bbox.y1 + 4)
+
+
+def restoreBackground(region):
+    """Put back the saved background within region, a Bbox in pixels."""
+    # The saved background is addressed from the top of the figure
+    height = fig.bbox.height
+    fig.canvas.restore_region(background,
+                              (region.x0, height - region.y1,
+                               region.x1, height - region.y0), (0, 0))
+
+
+def onDraw(event):
+    """Save the background after a full redraw, then draw the rest."""
+    global background
+    if not bBlit:
+        return
+
+    background = fig.canvas.copy_from_bbox(fig.bbox)
+    ax.draw_artist(graph)
+    for slider in sliders:
+        fig.draw_artist(slider.ax)
+        drawnValues[slider] = slider.val
+    fig.canvas.blit(fig.bbox)
+
+
+def redraw():
+    """Redraw the curve, and any slider which has moved."""
+    if not bBlit or background is None:
+        fig.canvas.draw_idle()
+        return
+
+    canvas = fig.canvas
+    moved = [s for s in sliders if drawnValues.get(s) != s.val]
+    regions = [ax.bbox.padded(1)] + [sliderRegion(s) for s in moved]
+
+    # Put back the background, then draw the changes over it
+    for region in regions:
+        restoreBackground(region)
+    ax.draw_artist(graph)
+    for slider in moved:
+        fig.draw_artist(slider.ax)
+        drawnValues[slider] = slider.val
+
+    for region in regions:
+        canvas.blit(region)
 
 
 # Define the update functions
@@ -60,10 +159,11 @@ def update(val):
     phi = sDelta.val
 
     # Update the data used for plotting
-    graph.set_data(x(omegaX, t), y(omegaY, phi, t))
+    xData, yData = coordinateBuffers(len(t))
+    graph.set_data(x(omegaX, t, out=xData), y(omegaY, phi, t, out=yData))
 
     # Re-plot the data
-    fig.canvas.draw_idle()
+    redraw()
 
 
 def updateT(val):
@@ -72,19 +172,11 @@ def updateT(val):
     global t
 
     # Get the values from the sliders
-    omegaX = sOmegaX.val
-    omegaY = sOmegaY.val
-    phi = sDelta.val
     num = sNum.val
 
-    # Update t
-    t = np.linspace(0, 2 * num * np.pi, int(1000 * num))
-
-    # Update the data used for plotting
-    graph.set_data(x(omegaX, t), y(omegaY, phi, t))
-
-    # Re-plot the data
-    fig.canvas.draw_idle()
+    # Update t, then the data used for plotting
+    t = tGrid(num)
+    update(val)
 
 
 # Associate the update functions with the sliders
@@ -92,6 +184,7 @@ sOmegaX.on_changed(update)
 sOmegaY.on_changed(update)
 sDelta.on_changed(update)
 sNum.on_changed(updateT)
+fig.canvas.mpl_connect("draw_event", onDraw)
 
 # Display everything
 plt.show()
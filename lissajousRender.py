@@ -0,0 +1,223 @@
+"""
+Draw Lissajous figures into images, without a window.
+
+The figures are drawn straight into NumPy arrays with antialiased lines,
+so no display server, wxPython or OpenGL is needed. A batch of figures,
+such as thumbnails for a report, can be drawn in a pool of processes and
+saved as .png or .npy files, along with an index.json listing the
+parameters of each file.
+
+Usage
+-----
+python lissajousRender.py thumbs --x-freq 1 2 3 --y-freq 1 2 --delta 0 1.57
+python lissajousRender.py large --parameters settings.csv --resolution 4096
+    --line-width 3 --format npy
+
+Functions
+---------
+curvePoints(xFreq, yFreq, delta, resolution, margin, step): The points of
+    the Lissajous figure in pixel coordinates
+drawCurve(image, points, lineWidth, chunkSize): Draw a curve into an image
+    with antialiasing
+renderFigure(xFreq, yFreq, delta, resolution, lineWidth, margin): The image
+    of a Lissajous figure
+saveImage(filename, image): Save an image as a .png or .npy file
+renderBatch(parameterSets, directory, ...): Draw and save the images for
+    all the parameter sets
+"""
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import gaussPow
+import gaussSweep
+
+
+def curvePoints(xFreq, yFreq, delta, resolution=256, margin=0.05, step=0.25):
+    """
+    Return the points of the Lissajous figure in pixel coordinates.
+
+    The figure is scaled to fill a resolution x resolution image, less a
+    margin (as a fraction of the image) on each side, with y pointing down
+    the rows. It is sampled over one period, or ten cycles if it never
+    closes, with the points at most step pixels apart.
+    """
+    period = gaussPow.fundamentalPeriod(xFreq, yFreq)
+    if period is None:
+        period = 20 * np.pi
+
+    # The figure moves no faster than this many pixels per unit of t
+    halfSize = (1 - 2 * margin) * resolution / 2
+    maxSpeed = halfSize * np.hypot(xFreq, yFreq)
+    numPoints = int(np.ceil(period * maxSpeed / step)) + 1
+
+    t = np.linspace(0, period, numPoints)
+    tx, ty = gaussPow.lissajousFigure(t, xFreq, yFreq, delta)
+    return np.column_stack((resolution / 2 + halfSize * tx,
+                            resolution / 2 - halfSize * ty))
+
+
+def drawCurve(image, points, lineWidth=1, chunkSize=2**15):
+    """
+    Draw a curve into a 2D image with antialiasing.
+
+    The points of the curve, in pixel coordinates (column, row), must be
+    close together (a quarter of a pixel or less), as each point is drawn
+    as a disc. The value of a pixel falls linearly, from 1 where its
+    centre is lineWidth / 2 - 0.5 from the curve to 0 where it is
+    lineWidth / 2 + 0.5 away, so a pixel centred on the edge of the line
+    is half covered (e.g. with lineWidth=3 a pixel 1.2 pixels away is set
+    to 0.8). Where the curve crosses itself the largest value is kept, so
+    crossings are no brighter than the rest.
+    """
+    height, width = image.shape
+    flat = image.reshape(-1)
+    reach = lineWidth / 2 + 0.5
+    offsets = np.arange(-int(np.ceil(reach)), int(np.ceil(reach)) + 1)
+
+    for start in range(0, len(points), chunkSize):
+        chunk = points[start:start + chunkSize]
+
+        # The pixels near each point, and the distances to their centres
+        columns = np.floor(chunk[:, 0]).astype(np.intp)[:, None] + offsets
+        rows = np.floor(chunk[:, 1]).astype(np.intp)[:, None] + offsets
+        dx = columns + 0.5 - chunk[:, :1]
+        dy = rows + 0.5 - chunk[:, 1:]
+        coverage = reach - np.hypot(dy[:, :, None], dx[:, None, :])
+
+        columns = np.broadcast_to(columns[:, None, :], coverage.shape)
+        rows = np.broadcast_to(rows[:, :, None], coverage.shape)
+        inside = ((coverage > 0) & (columns >= 0) & (columns < width) &
+                  (rows >= 0) & (rows < height))
+        np.maximum.at(flat, rows[inside] * width + columns[inside],
+                      np.minimum(coverage[inside], 1))
+
+    return image
+
+
+def renderFigure(xFreq, yFreq, delta, resolution=256, lineWidth=1,
+                 margin=0.05):
+    """Return a float32 image of the Lissajous figure, white on black."""
+    image = np.zeros((resolution, resolution), dtype=np.float32)
+    points = curvePoints(xFreq, yFreq, delta, resolution, margin)
+    return drawCurve(image, points, lineWidth)
+
+
+def saveImage(filename, image):
+    """Save an image with values from 0 to 1 as a .png or .npy file."""
+    if filename.endswith(".npy"):
+        np.save(filename, image)
+    else:
+        # matplotlib.image doesn't need a display, unlike pyplot
+        import matplotlib.image
+        matplotlib.image.imsave(filename, image, cmap="gray", vmin=0, vmax=1)
+
+
+def renderBatch(parameterSets, directory, resolution=256, lineWidth=1,
+                margin=0.05, fileFormat="png", workers=None):
+    """
+    Draw and save the images of a list of Lissajous figures.
+
+    The images are named by their position in the list, e.g. 00042.png,
+    and directory/index.json lists the parameters of each one.
+
+    Parameters
+    ----------
+    parameterSets: List of dicts holding xFreq, yFreq and delta for each
+                   figure; other keys are ignored
+    directory: Where to write the images and the index
+    resolution: Each image will be of size resolution x resolution
+    lineWidth: The width of the lines, in pixels
+    margin: The space left around each figure, as a fraction of the image
+    fileFormat: "png" or "npy"
+    workers: Number of worker processes; defaults to the number of CPUs
+
+    Returns
+    -------
+    filenames: The names of the files written
+    """
+    if fileFormat not in ("png", "npy"):
+        raise ValueError("Unknown file format: " + str(fileFormat))
+    os.makedirs(directory, exist_ok=True)
+
+    settings = {"resolution": int(resolution),
+                "lineWidth": float(lineWidth),
+                "margin": float(margin),
+                "parameters": [{name: float(p[name])
+                                for name in ("xFreq", "yFreq", "delta")}
+                               for p in parameterSets]}
+    settings["files"] = ["{:05d}.{}".format(k, fileFormat)
+                         for k in range(len(parameterSets))]
+    jobs = [(os.path.join(directory, filename), parameters)
+            for filename, parameters in zip(settings["files"],
+                                            settings["parameters"])]
+    if not jobs:
+        return []
+
+    # Hand out the figures in batches, as each one is quick to draw
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+    chunkSize = max(1, len(jobs) // (4 * workers))
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=initialiseWorker,
+                             initargs=(settings,)) as pool:
+        filenames = list(pool.map(workerImage, jobs, chunksize=chunkSize))
+
+    gaussSweep.writeIndex(directory, settings)
+    return filenames
+
+
+# State of a renderBatch() worker process, set by initialiseWorker()
+workerState = {}
+
+
+def initialiseWorker(settings):
+    """Store the drawing settings in a worker process."""
+    workerState["settings"] = settings
+
+
+def workerImage(job):
+    """Draw one figure and save it; return the name of the file."""
+    filename, parameters = job
+    settings = workerState["settings"]
+    image = renderFigure(parameters["xFreq"], parameters["yFreq"],
+                         parameters["delta"], settings["resolution"],
+                         settings["lineWidth"], settings["margin"])
+    saveImage(filename, image)
+    return filename
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Draw Lissajous figures into image files.")
+    parser.add_argument("directory",
+                        help="where to write the images and index.json")
+    parser.add_argument("--parameters",
+                        help="JSON or CSV file listing the parameter sets; "
+                             "otherwise every combination of the values "
+                             "below is used")
+    parser.add_argument("--x-freq", type=float, nargs="+", default=[1])
+    parser.add_argument("--y-freq", type=float, nargs="+", default=[1])
+    parser.add_argument("--delta", type=float, nargs="+",
+                        default=[np.pi / 2])
+    parser.add_argument("--resolution", type=int, default=256)
+    parser.add_argument("--line-width", type=float, default=1)
+    parser.add_argument("--margin", type=float, default=0.05)
+    parser.add_argument("--format", choices=("png", "npy"), default="png")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    if args.parameters:
+        parameterSets = gaussSweep.readParameters(args.parameters)
+    else:
+        parameterSets = gaussSweep.parameterGrid(args.x_freq, args.y_freq,
+                                                 args.delta)
+
+    filenames = renderBatch(parameterSets, args.directory, args.resolution,
+                            args.line_width, args.margin, args.format,
+                            args.workers)
+    print(len(filenames), "images written to", args.directory)
@@ -0,0 +1,114 @@
+"""
+Tests of the energy integration in gaussPow.py.
+
+Run with pytest.
+
+Functions
+---------
+scan(): The grid and the Lissajous figure used by the tests
+testZeroFrequency(): The period and windowed maps of figures with an axis
+    which stands still
+testTiledFft(): The tiled drivers and energyMap() agree with the "fft"
+    engine when a tile has only one row and column
+testSingleRowFft(): The "fft" engine agrees with the "direct" engine on a
+    grid with only one row
+testFloat32Spacing(): Evenly spaced float32 grids are accepted
+testOutOfCore(): outOfCoreEnergyMap() agrees with energyMap() for the
+    "splat" and "fft" engines, in float32 and float64
+"""
+
+import numpy as np
+import pytest
+
+import gaussPow
+
+
+# The spot-size used by the tests, in the x and y directions
+SIGMA2X = 0.003
+SIGMA2Y = 0.002
+
+
+def scan(n):
+    """Return x, y, tx, ty and dt for an n x n grid round a figure."""
+    t = np.linspace(0, 2 * np.pi, 3001)
+    tx, ty = gaussPow.lissajousFigure(t, 3, 2, 0.3)
+    x = np.linspace(-1.2, 1.2, n)
+    y = np.linspace(-1.1, 1.1, n)
+    return x, y, tx, ty, t[1] - t[0]
+
+
+def testZeroFrequency():
+    """Check an axis with zero frequency leaves the period to the other."""
+    assert gaussPow.fundamentalPeriod(2, 0) == pytest.approx(np.pi)
+    assert gaussPow.fundamentalPeriod(0, 2) == pytest.approx(np.pi)
+    assert gaussPow.fundamentalPeriod(0, 0) is None
+
+    x, y, _, _, _ = scan(21)
+    for xFreq, yFreq in ((2, 0), (0, 3)):
+        dt = gaussPow.commensurateStep(xFreq, yFreq, 0.01)
+        numSteps = int(round(2 / dt))
+        for _, _, points in gaussPow.windowedEnergyMaps(
+                x, y, SIGMA2X, SIGMA2Y, xFreq, yFreq, dt=dt, window=0.5,
+                duration=numSteps * dt, accumulate=True):
+            pass
+
+        t = np.arange(numSteps + 1) * dt
+        tx, ty = gaussPow.lissajousFigure(t, xFreq, yFreq)
+        expected = gaussPow.energyMap(x, y, tx, ty, dt, SIGMA2X, SIGMA2Y)
+        np.testing.assert_allclose(points, expected, rtol=1e-9,
+                                   atol=1e-12)
+
+
+def testTiledFft(tmp_path):
+    """Check tiles with one row and column are binned like the grid."""
+    tileSize = 16
+    x, y, tx, ty, dt = scan(tileSize + 1)
+    expected = gaussPow.energyMap(x, y, tx, ty, dt, SIGMA2X, SIGMA2Y,
+                                  engine="fft")
+
+    points = gaussPow.parallelEnergyMap(x, y, tx, ty, dt, SIGMA2X, SIGMA2Y,
+                                        workers=1, tileSize=tileSize,
+                                        engine="fft")
+    np.testing.assert_allclose(points, expected, rtol=1e-9, atol=1e-12)
+
+    points, _ = gaussPow.outOfCoreEnergyMap(
+        str(tmp_path / "energy.npy"), x, y, tx, ty, dt, SIGMA2X, SIGMA2Y,
+        tileSize=tileSize, dtype=np.float64, engine="fft")
+    np.testing.assert_allclose(points, expected, rtol=1e-9, atol=1e-12)
+
+
+def testSingleRowFft():
+    """Check a grid with one row is binned using the other axis."""
+    x, _, tx, ty, dt = scan(65)
+    y = [0.1]
+    expected = gaussPow.energyMap(x, y, tx, ty, dt, SIGMA2X, SIGMA2Y,
+                                  engine="direct")
+    error = gaussPow.compareEngines(x, y, tx, ty, dt, SIGMA2X, SIGMA2Y, "fft")
+    assert error < 0.01 * expected.max()
+
+
+def testFloat32Spacing():
+    """Check the spacing of float32 grids allows for their rounding."""
+    for n in (61, 201, 1024):
+        x = np.linspace(-1.2, 1.2, n, dtype=np.float32)
+        _, h = gaussPow.gridSpacing(x)
+        assert h == pytest.approx(2.4 / (n - 1), rel=1e-6)
+
+    with pytest.raises(ValueError):
+        gaussPow.gridSpacing(np.array([0, 1, 2, 3.001], dtype=np.float32))
+
+
+@pytest.mark.parametrize("engine", ["splat", "fft"])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def testOutOfCore(tmp_path, engine, dtype):
+    """Check the out-of-core map of the evenly spaced engines."""
+    x, y, tx, ty, dt = scan(61)
+    expected = gaussPow.energyMap(x, y, tx, ty, dt, SIGMA2X, SIGMA2Y,
+                                  engine=engine)
+
+    points, _ = gaussPow.outOfCoreEnergyMap(
+        str(tmp_path / "energy.npy"), x, y, tx, ty, dt, SIGMA2X, SIGMA2Y,
+        tileSize=32, dtype=dtype, engine=engine)
+    assert points.dtype == dtype
+    np.testing.assert_allclose(points, expected,
+                               atol=1e-4 * expected.max())